@@ -0,0 +1,235 @@
+import argparse
+import sys
+from collections import defaultdict
+from functools import lru_cache
+
+from joc_zaruri import COMPUTER_LEVELS, RULE_VARIANTS, GameDatabase, GamePolicy, compile_rules
+from rng_audit import chi_square
+
+END_REASONS = ('exact', 'bust', 'rolled_one', 'pass')
+DEFAULT_MAX_ROUNDS = 500
+DEFAULT_TOLERANCE = 1e-12
+
+
+def roll_probability_function(strategy, rules):
+    # probability of rolling in a state, computed on demand so large targets need no target^2 table
+    if strategy == 'always_roll':
+        return lambda score, opponent_score, opponent_passed: 1.0
+
+    if isinstance(strategy, tuple) and strategy[0] == 'threshold':
+        limit = strategy[1]
+        return lambda score, opponent_score, opponent_passed: 1.0 if score < limit else 0.0
+
+    if strategy == 'optimal':
+        noise = 0.0
+    elif isinstance(strategy, tuple) and strategy[0] == 'computer' and strategy[1] in COMPUTER_LEVELS:
+        noise = COMPUTER_LEVELS[strategy[1]][1]
+    else:
+        raise ValueError(f"Strategie necunoscuta: {strategy}")
+
+    policy = GamePolicy.for_rules(rules)
+    return lambda score, opponent_score, opponent_passed: (
+        (1 - noise) * policy.should_roll(score, opponent_score, opponent_passed) + noise / 2)
+
+
+@lru_cache(maxsize=64)
+def analyze_game(game_mode='standard', fete=6, target_score=21, strategy1='optimal', strategy2='optimal',
+                 max_rounds=DEFAULT_MAX_ROUNDS, tolerance=DEFAULT_TOLERANCE):
+    rules = compile_rules(game_mode, fete, target_score)
+    fatal_probability, point_probabilities = GamePolicy.roll_distribution(rules)
+    roll_functions = {1: roll_probability_function(strategy1, rules), 2: roll_probability_function(strategy2, rules)}
+
+    rounds = defaultdict(float)
+    end_reasons = defaultdict(float)
+    winners = defaultdict(float)
+    final_scores = defaultdict(float)
+
+    def finish(probability, step, reason, winner, score1, score2):
+        rounds[step] += probability
+        end_reasons[reason] += probability
+        winners[winner] += probability
+        final_scores[(score1, score2)] += probability
+
+    # probability mass over live states (score1, score2, player to move, last move was a pass);
+    # one step = one move
+    mass = {(0, 0, 1, False): 1.0}
+    step = 0
+    while mass and step <= max_rounds:
+        next_mass = defaultdict(float)
+        for (score1, score2, player, opponent_passed), probability in mass.items():
+            other = 2 if player == 1 else 1
+            score, opponent_score = (score1, score2) if player == 1 else (score2, score1)
+            roll_probability = roll_functions[player](score, opponent_score, opponent_passed)
+
+            if roll_probability > 0:
+                rolled = probability * roll_probability
+                if fatal_probability:
+                    finish(rolled * fatal_probability, step, 'rolled_one', other, score1, score2)
+                for points, chance in point_probabilities:
+                    new_score, outcome = rules.apply(score, points)
+                    scores = (new_score, score2) if player == 1 else (score1, new_score)
+                    if outcome == 'exact':
+                        finish(rolled * chance, step, 'exact', player, *scores)
+                    elif outcome == 'bust':
+                        finish(rolled * chance, step, 'bust', other, *scores)
+                    else:
+                        next_mass[scores + (other, False)] += rolled * chance
+
+            if roll_probability < 1:
+                passed = probability * (1 - roll_probability)
+                if rules.pass_ends_game(score1, score2, opponent_passed):
+                    winner = 1 if score1 > score2 else (2 if score2 > score1 else 0)
+                    finish(passed, step, 'pass', winner, score1, score2)
+                else:
+                    next_mass[(score1, score2, other, True)] += passed
+
+        mass = {state: p for state, p in next_mass.items() if p > tolerance * 1e-3}
+        step += 1
+        if sum(mass.values()) < tolerance:
+            break
+
+    finished = sum(rounds.values())
+    expected_rounds = sum(r * p for r, p in rounds.items()) / finished if finished else 0.0
+    return {
+        'game_mode': rules.name,
+        'fete': fete,
+        'target_score': target_score,
+        'strategies': (strategy1, strategy2),
+        'rounds': dict(sorted(rounds.items())),
+        'end_reasons': {reason: end_reasons.get(reason, 0.0) for reason in END_REASONS},
+        'winners': {winner: winners.get(winner, 0.0) for winner in (1, 2, 0)},
+        'final_scores': dict(final_scores),
+        'unfinished': max(0.0, 1.0 - finished),
+        'expected_rounds': expected_rounds,
+        # the move that ends the game is not counted in round_count
+        'expected_moves': expected_rounds + 1
+    }
+
+
+def score_distribution(distribution, seat):
+    marginal = defaultdict(float)
+    for scores, probability in distribution['final_scores'].items():
+        marginal[scores[seat - 1]] += probability
+    return dict(sorted(marginal.items()))
+
+
+def games_per_hour(distribution, seconds_per_move):
+    if seconds_per_move <= 0:
+        return 0.0
+    return 3600 / (distribution['expected_moves'] * seconds_per_move)
+
+
+def load_history(database, game_mode='standard', fete=6, target_score=21):
+    # only games played with the same die and target are comparable; older rows without them are left out
+    totals = {'total_rounds': defaultdict(int), 'end_reason': defaultdict(int), 'winner': defaultdict(int)}
+    for column, counts in totals.items():
+        for rows in database.query_shards(f'''
+            SELECT {column}, COUNT(*) FROM game_history
+            WHERE game_mode = ? AND dice_faces = ? AND target_score = ? AND {column} IS NOT NULL
+            GROUP BY {column}
+        ''', (game_mode, fete, target_score)):
+            for value, count in rows:
+                counts[value] += count
+
+    rounds = dict(totals['total_rounds'])
+    return {'games': sum(rounds.values()), 'rounds': rounds,
+            'end_reasons': dict(totals['end_reason']), 'winners': dict(totals['winner'])}
+
+
+def _binned_rounds(expected, observed, total, min_expected=5):
+    # merge neighbouring round counts until every bin expects at least min_expected games
+    bins = []
+    expected_count = observed_count = 0.0
+    for rounds in sorted(set(expected) | set(observed)):
+        expected_count += expected.get(rounds, 0.0) * total
+        observed_count += observed.get(rounds, 0)
+        if expected_count >= min_expected:
+            bins.append((observed_count, expected_count))
+            expected_count = observed_count = 0.0
+    if bins and (expected_count or observed_count):
+        last_observed, last_expected = bins[-1]
+        bins[-1] = (last_observed + observed_count, last_expected + expected_count)
+    return bins
+
+
+def compare_with_history(distribution, history):
+    total = history['games']
+    if not total:
+        return None
+
+    bins = _binned_rounds(distribution['rounds'], history['rounds'], total)
+    if len(bins) > 1:
+        statistic, df, p_value = chi_square([o for o, _ in bins], [e for _, e in bins])
+    else:
+        statistic, df, p_value = 0.0, 0, 1.0
+
+    observed_reasons = sum(history['end_reasons'].values())
+    reason_distance = 0.0
+    if observed_reasons:
+        reason_distance = 0.5 * sum(
+            abs(history['end_reasons'].get(reason, 0) / observed_reasons - distribution['end_reasons'][reason])
+            for reason in END_REASONS
+        )
+
+    observed_mean = sum(r * n for r, n in history['rounds'].items()) / total
+    return {
+        'games': total,
+        'rounds_chi_square': {'statistic': statistic, 'df': df, 'p_value': p_value},
+        'observed_mean_rounds': observed_mean,
+        'expected_mean_rounds': distribution['expected_rounds'],
+        'end_reason_distance': reason_distance
+    }
+
+
+def parse_strategy(text):
+    if text.startswith('threshold:'):
+        return ('threshold', int(text.split(':', 1)[1]))
+    if text.startswith('computer:'):
+        return ('computer', text.split(':', 1)[1])
+    return text
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Distributia exacta a duratei si rezultatelor jocului")
+    parser.add_argument('--mode', choices=RULE_VARIANTS, default='standard')
+    parser.add_argument('--fete', type=int, default=6)
+    parser.add_argument('--target', type=int, default=21)
+    parser.add_argument('--strategy1', default='optimal',
+                        help="optimal, always_roll, threshold:N sau computer:usor|mediu|greu")
+    parser.add_argument('--strategy2', default='optimal')
+    parser.add_argument('--seconds-per-move', type=float, default=3.0)
+    parser.add_argument('--db', help="compara cu jocurile salvate in aceasta baza de date")
+    args = parser.parse_args(argv)
+
+    distribution = analyze_game(args.mode, args.fete, args.target,
+                                parse_strategy(args.strategy1), parse_strategy(args.strategy2))
+
+    print(f"Runde medii: {distribution['expected_rounds']:.2f}  "
+          f"(jocuri/ora la {args.seconds_per_move:.1f}s/mutare: "
+          f"{games_per_hour(distribution, args.seconds_per_move):.1f})")
+    print("Motiv final: " + ", ".join(f"{reason} {p * 100:.1f}%"
+                                      for reason, p in distribution['end_reasons'].items()))
+    print("Castigator: " + ", ".join(f"{'egal' if w == 0 else f'J{w}'} {p * 100:.1f}%"
+                                     for w, p in distribution['winners'].items()))
+    if distribution['unfinished'] >= 0.001:
+        print(f"Nu se termina: {distribution['unfinished'] * 100:.1f}%")
+    peak = max(distribution['rounds'].values(), default=0)
+    for rounds, probability in distribution['rounds'].items():
+        if probability >= 0.001:
+            print(f"{rounds:4d} {probability * 100:6.2f}% {'#' * int(50 * probability / peak)}")
+
+    if args.db:
+        history = load_history(GameDatabase(args.db), args.mode, args.fete, args.target)
+        comparison = compare_with_history(distribution, history)
+        if comparison is None:
+            print("Nu exista jocuri salvate pentru aceasta varianta")
+        else:
+            chi = comparison['rounds_chi_square']
+            print(f"Istoric: {comparison['games']} jocuri, runde medii {comparison['observed_mean_rounds']:.2f}, "
+                  f"chi2={chi['statistic']:.2f} (df={chi['df']}) p={chi['p_value']:.4f}, "
+                  f"distanta motive final={comparison['end_reason_distance']:.3f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,21 +1,141 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 import random
+import math
 import sqlite3
 import json
-from datetime import datetime, timedelta
+import os
+import gzip
+import glob
+from datetime import datetime, timedelta, timezone
 import threading
 import time
+import queue
+import traceback
+from concurrent.futures import Future
+from bisect import bisect_left
+from itertools import chain, islice, product
+from heapq import merge
+from functools import lru_cache
+import zlib
+
+ROLLUP_PERIODS = ('hour', 'day', 'week')
+MAX_POLICY_STATES = 2500
+# states times point totals per solver sweep, so large dice are bounded too; above either limit
+# the computer falls back to heuristic_roll
+MAX_POLICY_WORK = 50000
+# per-move discount in the policy solver: a quicker win is worth a little more, so endless passing never pays
+POLICY_DISCOUNT = 0.99
+COMPUTER_MOVE_DELAY = 700
+DB_POLL_INTERVAL = 50
+MAINTENANCE_CHECK_INTERVAL = 30000
+MAINTENANCE_STEP_INTERVAL = 200
+MAINTENANCE_IDLE_SECONDS = 60
+COMPUTER_LEVELS = {
+    'usor': ("Usor", 0.3),
+    'mediu': ("Mediu", 0.1),
+    'greu': ("Greu", 0.0)
+}
+COMPUTER_NAMES = {level: f"Calculator ({label})" for level, (label, _) in COMPUTER_LEVELS.items()}
+# seats nobody has named are not tracked as players
+DEFAULT_PLAYER_NAMES = ("Jucator 1", "Jucator 2")
+ELO_INITIAL_RATING = 1500.0
+ELO_K_FACTOR = 32
+DECISION_TIME_BINS = (0.25, 0.5, 1.0, 1.5, 2.0, 3.0, 5.0, 8.0, 13.0, 20.0, 30.0, 60.0)
+# game ids of shard k start at k * SHARD_ID_SPAN, so they stay unique and fit the u32 field of move_log
+SHARD_ID_SPAN = 10 ** 8
+MAX_SHARDS = 32
+DICE_IMAGE_SIZE = 72
+DICE_SIZE_STEP = 8
+DICE_ANIMATION_FRAMES = 8
+DICE_ANIMATION_DELAY = 0.08
+DICE_RESIZE_DELAY = 150
+# pip positions on a 3x3 grid; faces above 9 are drawn as numbers
+PIP_LAYOUTS = {
+    1: ((1, 1),),
+    2: ((0, 0), (2, 2)),
+    3: ((0, 0), (1, 1), (2, 2)),
+    4: ((0, 0), (0, 2), (2, 0), (2, 2)),
+    5: ((0, 0), (0, 2), (1, 1), (2, 0), (2, 2)),
+    6: ((0, 0), (0, 2), (1, 0), (1, 2), (2, 0), (2, 2)),
+    7: ((0, 0), (0, 2), (1, 0), (1, 1), (1, 2), (2, 0), (2, 2)),
+    8: ((0, 0), (0, 1), (0, 2), (1, 0), (1, 2), (2, 0), (2, 1), (2, 2)),
+    9: tuple(product(range(3), repeat=2))
+}
+DIGIT_GLYPHS = {
+    '0': ('111', '101', '101', '101', '111'),
+    '1': ('010', '110', '010', '010', '111'),
+    '2': ('111', '001', '111', '100', '111'),
+    '3': ('111', '001', '011', '001', '111'),
+    '4': ('101', '101', '111', '001', '001'),
+    '5': ('111', '100', '111', '001', '111'),
+    '6': ('111', '100', '111', '101', '111'),
+    '7': ('111', '001', '010', '010', '010'),
+    '8': ('111', '101', '111', '101', '111'),
+    '9': ('111', '101', '111', '001', '111')
+}
 
 class GameDatabase:
-    def __init__(self, db_path="dice_game.db"):
+    def __init__(self, db_path="dice_game.db", shards=1, shard_index=0, busy_timeout=5.0):
         self.db_path = db_path
+        self.shard_index = shard_index
+        # seconds a connection waits on a locked file before raising OperationalError
+        self.busy_timeout = busy_timeout
         self.init_database()
+        self.shards = [self]
+        if shard_index == 0:
+            self.open_shards(shards)
+    
+    def connect(self):
+        return sqlite3.connect(self.db_path, timeout=self.busy_timeout)
+    
+    def shard_path(self, index):
+        root, ext = os.path.splitext(self.db_path)
+        return f"{root}.shard{index}{ext}"
+    
+    def open_shards(self, shards):
+        if not 1 <= shards <= MAX_SHARDS:
+            raise ValueError(f"Numarul de fragmente trebuie sa fie intre 1 si {MAX_SHARDS}")
+        
+        # the count only grows: game ids point at their shard, so every shard file stays readable
+        stored = int(self.get_maintenance_value('shard_count') or 1)
+        if shards > stored:
+            conn = self.connect()
+            cursor = conn.cursor()
+            if stored == 1:
+                # games already in the main file were rated when they were saved
+                cursor.execute('SELECT COALESCE(MAX(id), 0) FROM game_history')
+                self.set_maintenance_value(cursor, 'rated_through_0', str(cursor.fetchone()[0]))
+            self.set_maintenance_value(cursor, 'shard_count', str(shards))
+            conn.commit()
+            conn.close()
+        
+        self.shards += [GameDatabase(self.shard_path(index), shard_index=index,
+                                     busy_timeout=self.busy_timeout)
+                        for index in range(1, max(shards, stored))]
+    
+    def shard_for(self, key):
+        if key is None or len(self.shards) == 1:
+            return self
+        if not isinstance(key, int):
+            key = zlib.crc32(str(key).encode('utf-8'))
+        return self.shards[key % len(self.shards)]
+    
+    def query_shards(self, query, params=()):
+        results = []
+        for shard in self.shards:
+            conn = shard.connect()
+            results.append(conn.execute(query, params).fetchall())
+            conn.close()
+        return results
     
     def init_database(self):
-        conn = sqlite3.connect(self.db_path)
+        conn = self.connect()
         cursor = conn.cursor()
         
+        # only takes effect on a new, empty database; existing ones need a full VACUUM to convert
+        cursor.execute('PRAGMA auto_vacuum = INCREMENTAL')
+        
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS game_history (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -56,26 +176,670 @@ class GameDatabase:
             )
         ''')
         
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'game_rollups'")
+        rollups_are_new = cursor.fetchone() is None
+        
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS game_rollups (
+                period TEXT,
+                bucket_start TEXT,
+                games INTEGER DEFAULT 0,
+                player1_wins INTEGER DEFAULT 0,
+                player2_wins INTEGER DEFAULT 0,
+                draws INTEGER DEFAULT 0,
+                total_rounds INTEGER DEFAULT 0,
+                total_duration REAL DEFAULT 0,
+                exact_wins INTEGER DEFAULT 0,
+                busts INTEGER DEFAULT 0,
+                one_losses INTEGER DEFAULT 0,
+                pass_endings INTEGER DEFAULT 0,
+                moves INTEGER DEFAULT 0,
+                total_decision_time REAL DEFAULT 0,
+                PRIMARY KEY (period, bucket_start)
+            )
+        ''')
+        
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS decision_time_rollups (
+                period TEXT,
+                bucket_start TEXT,
+                bin INTEGER,
+                count INTEGER DEFAULT 0,
+                PRIMARY KEY (period, bucket_start, bin)
+            )
+        ''')
+        
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS players (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT UNIQUE NOT NULL,
+                created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS game_participants (
+                game_id INTEGER,
+                seat INTEGER,
+                player_id INTEGER,
+                score INTEGER,
+                won INTEGER,
+                timestamp DATETIME,
+                PRIMARY KEY (game_id, seat),
+                FOREIGN KEY (game_id) REFERENCES game_history (id),
+                FOREIGN KEY (player_id) REFERENCES players (id)
+            )
+        ''')
+        
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS player_profiles (
+                player_id INTEGER PRIMARY KEY,
+                games INTEGER DEFAULT 0,
+                wins INTEGER DEFAULT 0,
+                draws INTEGER DEFAULT 0,
+                total_score INTEGER DEFAULT 0,
+                winning_score INTEGER DEFAULT 0,
+                total_rounds INTEGER DEFAULT 0,
+                total_duration REAL DEFAULT 0,
+                moves INTEGER DEFAULT 0,
+                rolls INTEGER DEFAULT 0,
+                total_decision_time REAL DEFAULT 0,
+                last_played DATETIME,
+                FOREIGN KEY (player_id) REFERENCES players (id)
+            )
+        ''')
+        
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS player_ratings (
+                player_id INTEGER PRIMARY KEY,
+                rating REAL DEFAULT 1500,
+                games INTEGER DEFAULT 0,
+                updated_at DATETIME,
+                FOREIGN KEY (player_id) REFERENCES players (id)
+            )
+        ''')
+        
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS maintenance_state (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            )
+        ''')
+        
+        self.ensure_column(cursor, 'game_history', 'end_reason', 'TEXT')
+        self.ensure_column(cursor, 'game_history', 'dice_faces', 'INTEGER')
+        self.ensure_column(cursor, 'game_history', 'target_score', 'INTEGER')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_player_ratings_rating
+            ON player_ratings (rating DESC, player_id)
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_game_participants_player
+            ON game_participants (player_id, timestamp)
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_game_history_timestamp ON game_history (timestamp)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_player_moves_game ON player_moves (game_id)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_player_moves_timestamp ON player_moves (timestamp)')
+        
+        if self.shard_index:
+            cursor.execute('''
+                INSERT INTO sqlite_sequence (name, seq)
+                SELECT 'game_history', ? WHERE NOT EXISTS
+                    (SELECT 1 FROM sqlite_sequence WHERE name = 'game_history')
+            ''', (self.shard_index * SHARD_ID_SPAN,))
+        
+        cursor.execute('SELECT EXISTS (SELECT 1 FROM game_history)')
+        has_games = cursor.fetchone()[0]
+        
         conn.commit()
         conn.close()
+        
+        if rollups_are_new and has_games:
+            # a database from before the rollups: backfill once so the trends include the old games
+            self.rebuild_shard_rollups()
     
-    def save_game(self, player1_score, player2_score, winner, total_rounds, game_duration):
-        conn = sqlite3.connect(self.db_path)
+    def ensure_column(self, cursor, table, column, definition):
+        cursor.execute(f'PRAGMA table_info({table})')
+        if column not in [row[1] for row in cursor.fetchall()]:
+            cursor.execute(f'ALTER TABLE {table} ADD COLUMN {column} {definition}')
+    
+    def save_game(self, player1_score, player2_score, winner, total_rounds, game_duration,
+                  moves=None, end_reason=None, game_mode='standard', player_ids=None, shard_key=None,
+                  dice_faces=None, target_score=None):
+        # with several shards the ratings are applied later by sync_ratings, in timestamp order
+        shard = self.shard_for(shard_key)
+        return shard.write_game(player1_score, player2_score, winner, total_rounds, game_duration,
+                                moves, end_reason, game_mode, player_ids, rate=len(self.shards) == 1,
+                                dice_faces=dice_faces, target_score=target_score)
+    
+    def write_game(self, player1_score, player2_score, winner, total_rounds, game_duration,
+                   moves, end_reason, game_mode, player_ids, rate=True, dice_faces=None, target_score=None):
+        conn = self.connect()
         cursor = conn.cursor()
         
         cursor.execute('''
             INSERT INTO game_history 
-            (player1_score, player2_score, winner, total_rounds, game_duration)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (player1_score, player2_score, winner, total_rounds, game_duration))
+            (player1_score, player2_score, winner, total_rounds, game_duration, end_reason, game_mode,
+             dice_faces, target_score)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (player1_score, player2_score, winner, total_rounds, game_duration, end_reason, game_mode,
+              dice_faces, target_score))
         
         game_id = cursor.lastrowid
+        moves = moves or []
+        
+        cursor.executemany('''
+            INSERT INTO player_moves 
+            (game_id, player, action, dice_result, score_before, score_after, decision_time)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', [(game_id,) + tuple(move) for move in moves])
+        
+        cursor.execute('SELECT timestamp FROM game_history WHERE id = ?', (game_id,))
+        timestamp = cursor.fetchone()[0]
+        decision_times = [move[5] for move in moves if move[5]]
+        self.update_rollups(cursor, timestamp, winner, total_rounds, game_duration,
+                            end_reason, len(moves), decision_times)
+        
+        if player_ids:
+            scores = (player1_score, player2_score)
+            for seat, player_id in enumerate(player_ids, start=1):
+                if player_id is None:
+                    continue
+                seat_moves = [move for move in moves if move[0] == seat]
+                self.update_player_profile(cursor, game_id, seat, player_id, scores[seat - 1],
+                                           winner, total_rounds, game_duration, seat_moves, timestamp)
+            
+            if rate and len(player_ids) == 2 and None not in player_ids:
+                self.update_ratings(cursor, player_ids[0], player_ids[1], winner, timestamp)
+        
         conn.commit()
         conn.close()
         return game_id
     
+    def update_player_profile(self, cursor, game_id, seat, player_id, score, winner,
+                              total_rounds, game_duration, moves, timestamp):
+        won = int(winner == seat)
+        cursor.execute('''
+            INSERT INTO game_participants (game_id, seat, player_id, score, won, timestamp)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', (game_id, seat, player_id, score, won, timestamp))
+        
+        cursor.execute('''
+            INSERT INTO player_profiles
+            (player_id, games, wins, draws, total_score, winning_score, total_rounds,
+             total_duration, moves, rolls, total_decision_time, last_played)
+            VALUES (?, 1, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (player_id) DO UPDATE SET
+                games = games + 1,
+                wins = wins + excluded.wins,
+                draws = draws + excluded.draws,
+                total_score = total_score + excluded.total_score,
+                winning_score = winning_score + excluded.winning_score,
+                total_rounds = total_rounds + excluded.total_rounds,
+                total_duration = total_duration + excluded.total_duration,
+                moves = moves + excluded.moves,
+                rolls = rolls + excluded.rolls,
+                total_decision_time = total_decision_time + excluded.total_decision_time,
+                last_played = excluded.last_played
+        ''', (player_id, won, int(winner == 0), score, score if won else 0,
+              total_rounds or 0, game_duration or 0, len(moves),
+              sum(1 for move in moves if move[1] == 'roll'),
+              sum(move[5] or 0 for move in moves), timestamp))
+    
+    def elo_update(self, rating1, rating2, winner):
+        expected1 = 1 / (1 + 10 ** ((rating2 - rating1) / 400))
+        actual1 = 0.5 if winner == 0 else (1.0 if winner == 1 else 0.0)
+        delta = ELO_K_FACTOR * (actual1 - expected1)
+        return rating1 + delta, rating2 - delta
+    
+    def update_ratings(self, cursor, player1_id, player2_id, winner, timestamp):
+        ratings = {}
+        for player_id in (player1_id, player2_id):
+            cursor.execute('SELECT rating FROM player_ratings WHERE player_id = ?', (player_id,))
+            row = cursor.fetchone()
+            ratings[player_id] = row[0] if row else ELO_INITIAL_RATING
+        
+        new_ratings = self.elo_update(ratings[player1_id], ratings[player2_id], winner)
+        for player_id, rating in zip((player1_id, player2_id), new_ratings):
+            cursor.execute('''
+                INSERT INTO player_ratings (player_id, rating, games, updated_at)
+                VALUES (?, ?, 1, ?)
+                ON CONFLICT (player_id) DO UPDATE SET
+                    rating = excluded.rating,
+                    games = games + 1,
+                    updated_at = excluded.updated_at
+            ''', (player_id, rating, timestamp))
+    
+    def rated_games_query(self, order):
+        return f'''
+            SELECT g.timestamp, g.id, p1.player_id, p2.player_id, g.winner
+            FROM game_history g
+            JOIN game_participants p1 ON p1.game_id = g.id AND p1.seat = 1
+            JOIN game_participants p2 ON p2.game_id = g.id AND p2.seat = 2
+            WHERE g.id > ?
+            ORDER BY {order}
+        '''
+    
+    def sync_ratings(self):
+        if len(self.shards) == 1:
+            return 0
+        
+        conn = self.connect()
+        cursor = conn.cursor()
+        # the write lock on the main file keeps two processes from applying the same games
+        cursor.execute('BEGIN IMMEDIATE')
+        
+        pending = []
+        for shard in self.shards:
+            key = f'rated_through_{shard.shard_index}'
+            cursor.execute('SELECT value FROM maintenance_state WHERE key = ?', (key,))
+            row = cursor.fetchone()
+            shard_conn = shard.connect()
+            games = shard_conn.execute(self.rated_games_query('g.id'), (int(row[0]) if row else 0,)).fetchall()
+            shard_conn.close()
+            if games:
+                self.set_maintenance_value(cursor, key, str(games[-1][1]))
+                pending.extend(games)
+        
+        pending.sort()
+        for timestamp, _, player1_id, player2_id, winner in pending:
+            self.update_ratings(cursor, player1_id, player2_id, winner, timestamp)
+        
+        conn.commit()
+        conn.close()
+        return len(pending)
+    
+    def recompute_ratings(self, earlier_games=()):
+        conn = self.connect()
+        cursor = conn.cursor()
+        if len(self.shards) > 1:
+            cursor.execute('BEGIN IMMEDIATE')
+        
+        ratings = {}
+        games_played = {}
+        last_played = {}
+        if len(self.shards) == 1:
+            live_games = conn.execute(self.rated_games_query('g.id'), (0,))
+        else:
+            shard_games = self.query_shards(self.rated_games_query('g.timestamp, g.id'), (0,))
+            for shard, games in zip(self.shards, shard_games):
+                if games:
+                    self.set_maintenance_value(cursor, f'rated_through_{shard.shard_index}',
+                                               str(max(game[1] for game in games)))
+            live_games = merge(*shard_games)
+        for timestamp, _, player1_id, player2_id, winner in chain(earlier_games, live_games):
+            rating1 = ratings.get(player1_id, ELO_INITIAL_RATING)
+            rating2 = ratings.get(player2_id, ELO_INITIAL_RATING)
+            ratings[player1_id], ratings[player2_id] = self.elo_update(rating1, rating2, winner)
+            for player_id in (player1_id, player2_id):
+                games_played[player_id] = games_played.get(player_id, 0) + 1
+                last_played[player_id] = timestamp
+        
+        cursor.execute('DELETE FROM player_ratings')
+        cursor.executemany('''
+            INSERT INTO player_ratings (player_id, rating, games, updated_at)
+            VALUES (?, ?, ?, ?)
+        ''', [(player_id, rating, games_played[player_id], last_played[player_id])
+              for player_id, rating in ratings.items()])
+        
+        conn.commit()
+        conn.close()
+        return len(ratings)
+    
+    def get_leaderboard(self, limit=10, offset=0):
+        self.sync_ratings()
+        conn = self.connect()
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            SELECT r.player_id, p.name, r.rating, r.games
+            FROM player_ratings r
+            JOIN players p ON p.id = r.player_id
+            ORDER BY r.rating DESC, r.player_id
+            LIMIT ? OFFSET ?
+        ''', (limit, offset))
+        
+        rows = cursor.fetchall()
+        conn.close()
+        return [(offset + index + 1,) + row for index, row in enumerate(rows)]
+    
+    def get_player_rank(self, player_id):
+        self.sync_ratings()
+        conn = self.connect()
+        cursor = conn.cursor()
+        
+        cursor.execute('SELECT rating, games FROM player_ratings WHERE player_id = ?', (player_id,))
+        row = cursor.fetchone()
+        if not row:
+            conn.close()
+            return None
+        
+        rating, games = row
+        cursor.execute('''
+            SELECT COUNT(*) FROM player_ratings
+            WHERE rating > ? OR (rating = ? AND player_id < ?)
+        ''', (rating, rating, player_id))
+        rank = cursor.fetchone()[0] + 1
+        conn.close()
+        return {'rank': rank, 'rating': rating, 'games': games}
+    
+    def get_or_create_player(self, name):
+        name = name.strip()
+        if not name:
+            raise ValueError("Numele jucatorului nu poate fi gol")
+        
+        conn = self.connect()
+        cursor = conn.cursor()
+        
+        cursor.execute('INSERT OR IGNORE INTO players (name) VALUES (?)', (name,))
+        cursor.execute('SELECT id FROM players WHERE name = ?', (name,))
+        player_id = cursor.fetchone()[0]
+        
+        conn.commit()
+        conn.close()
+        return player_id
+    
+    def get_player_ids(self, names):
+        return [self.get_or_create_player(name) for name in names]
+    
+    def find_player(self, name):
+        conn = self.connect()
+        cursor = conn.cursor()
+        
+        cursor.execute('SELECT id FROM players WHERE name = ?', (name.strip(),))
+        row = cursor.fetchone()
+        conn.close()
+        return row[0] if row else None
+    
+    def get_player_profile(self, player_id):
+        conn = self.connect()
+        cursor = conn.cursor()
+        
+        cursor.execute('SELECT name FROM players WHERE id = ?', (player_id,))
+        row = cursor.fetchone()
+        conn.close()
+        if not row:
+            return None
+        
+        name = row[0]
+        # profile counters are kept per shard and add up
+        totals = [0] * 10
+        last_played = None
+        for rows in self.query_shards('''
+            SELECT games, wins, draws, total_score, winning_score, total_rounds,
+                   total_duration, moves, rolls, total_decision_time, last_played
+            FROM player_profiles WHERE player_id = ?
+        ''', (player_id,)):
+            for row in rows:
+                totals = [total + (value or 0) for total, value in zip(totals, row)]
+                if row[10] and (last_played is None or row[10] > last_played):
+                    last_played = row[10]
+        
+        (games, wins, draws, total_score, winning_score, total_rounds,
+         total_duration, moves, rolls, total_decision_time) = totals
+        games = games or 0
+        wins = wins or 0
+        return {
+            'player_id': player_id,
+            'name': name,
+            'games': games,
+            'wins': wins,
+            'draws': draws or 0,
+            'losses': games - wins - (draws or 0),
+            'win_rate': wins / games * 100 if games else 0,
+            'avg_score': total_score / games if games else 0,
+            'avg_winning_score': winning_score / wins if wins else 0,
+            'avg_rounds': total_rounds / games if games else 0,
+            'avg_duration': total_duration / games if games else 0,
+            'avg_decision_time': total_decision_time / moves if moves else 0,
+            'rolls': rolls or 0,
+            'last_played': last_played
+        }
+    
+    def get_player_games(self, player_id, limit=10):
+        shard_games = self.query_shards('''
+            SELECT gp.game_id, gp.seat, gp.score, gp.won, gp.timestamp
+            FROM game_participants gp
+            WHERE gp.player_id = ?
+            ORDER BY gp.timestamp DESC
+            LIMIT ?
+        ''', (player_id, limit))
+        
+        if len(shard_games) == 1:
+            return shard_games[0]
+        return list(islice(merge(*shard_games, key=lambda game: game[4], reverse=True), limit))
+    
+    def rollup_buckets(self, timestamp):
+        dt = datetime.fromisoformat(timestamp)
+        day = dt.replace(hour=0, minute=0, second=0, microsecond=0)
+        return {
+            'hour': dt.strftime('%Y-%m-%d %H:00:00'),
+            'day': day.strftime('%Y-%m-%d'),
+            'week': (day - timedelta(days=day.weekday())).strftime('%Y-%m-%d')
+        }
+    
+    def update_rollups(self, cursor, timestamp, winner, total_rounds, game_duration,
+                       end_reason, move_count, decision_times, min_buckets=None):
+        bins = {}
+        for decision_time in decision_times:
+            index = bisect_left(DECISION_TIME_BINS, decision_time)
+            bins[index] = bins.get(index, 0) + 1
+        
+        for period, bucket_start in self.rollup_buckets(timestamp).items():
+            if min_buckets and bucket_start < min_buckets[period]:
+                continue
+            cursor.execute('''
+                INSERT INTO game_rollups
+                (period, bucket_start, games, player1_wins, player2_wins, draws, total_rounds,
+                 total_duration, exact_wins, busts, one_losses, pass_endings, moves, total_decision_time)
+                VALUES (?, ?, 1, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (period, bucket_start) DO UPDATE SET
+                    games = games + 1,
+                    player1_wins = player1_wins + excluded.player1_wins,
+                    player2_wins = player2_wins + excluded.player2_wins,
+                    draws = draws + excluded.draws,
+                    total_rounds = total_rounds + excluded.total_rounds,
+                    total_duration = total_duration + excluded.total_duration,
+                    exact_wins = exact_wins + excluded.exact_wins,
+                    busts = busts + excluded.busts,
+                    one_losses = one_losses + excluded.one_losses,
+                    pass_endings = pass_endings + excluded.pass_endings,
+                    moves = moves + excluded.moves,
+                    total_decision_time = total_decision_time + excluded.total_decision_time
+            ''', (period, bucket_start,
+                  int(winner == 1), int(winner == 2), int(winner == 0),
+                  total_rounds or 0, game_duration or 0,
+                  int(end_reason == 'exact'), int(end_reason == 'bust'),
+                  int(end_reason == 'rolled_one'), int(end_reason == 'pass'),
+                  move_count, sum(decision_times)))
+            
+            cursor.executemany('''
+                INSERT INTO decision_time_rollups (period, bucket_start, bin, count)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT (period, bucket_start, bin) DO UPDATE SET
+                    count = count + excluded.count
+            ''', [(period, bucket_start, index, count) for index, count in bins.items()])
+    
+    def next_bucket_start(self, period, timestamp):
+        bucket_start = datetime.fromisoformat(self.rollup_buckets(timestamp)[period])
+        if period == 'hour':
+            return (bucket_start + timedelta(hours=1)).strftime('%Y-%m-%d %H:00:00')
+        step = timedelta(days=7 if period == 'week' else 1)
+        return (bucket_start + step).strftime('%Y-%m-%d')
+    
+    def rebuild_rollups(self, since=None):
+        return sum(shard.rebuild_shard_rollups(since) for shard in self.shards)
+    
+    def rebuild_shard_rollups(self, since=None):
+        # buckets that may contain compacted games or moves are kept as they are
+        if since is None:
+            since = self.get_compaction_cutoff()
+        
+        conn = self.connect()
+        cursor = conn.cursor()
+        moves_cursor = conn.cursor()
+        
+        min_buckets = None
+        first_timestamp = ''
+        if since is None:
+            cursor.execute('DELETE FROM game_rollups')
+            cursor.execute('DELETE FROM decision_time_rollups')
+        else:
+            min_buckets = {period: self.next_bucket_start(period, since) for period in ROLLUP_PERIODS}
+            for period, bucket_start in min_buckets.items():
+                cursor.execute('DELETE FROM game_rollups WHERE period = ? AND bucket_start >= ?',
+                               (period, bucket_start))
+                cursor.execute('DELETE FROM decision_time_rollups WHERE period = ? AND bucket_start >= ?',
+                               (period, bucket_start))
+            first_timestamp = min(min_buckets.values())
+        
+        games = conn.execute('''
+            SELECT id, timestamp, winner, total_rounds, game_duration, end_reason
+            FROM game_history WHERE timestamp >= ? ORDER BY id
+        ''', (first_timestamp,))
+        rebuilt = 0
+        for game_id, timestamp, winner, total_rounds, game_duration, end_reason in games:
+            moves_cursor.execute('SELECT decision_time FROM player_moves WHERE game_id = ?', (game_id,))
+            decision_times = [row[0] for row in moves_cursor.fetchall()]
+            self.update_rollups(cursor, timestamp, winner, total_rounds, game_duration, end_reason,
+                                len(decision_times), [t for t in decision_times if t], min_buckets)
+            rebuilt += 1
+        
+        conn.commit()
+        conn.close()
+        return rebuilt
+    
+    def get_maintenance_value(self, key):
+        conn = self.connect()
+        cursor = conn.cursor()
+        
+        cursor.execute('SELECT value FROM maintenance_state WHERE key = ?', (key,))
+        row = cursor.fetchone()
+        conn.close()
+        return row[0] if row else None
+    
+    def set_maintenance_value(self, cursor, key, value):
+        cursor.execute('''
+            INSERT INTO maintenance_state (key, value) VALUES (?, ?)
+            ON CONFLICT (key) DO UPDATE SET value = excluded.value
+        ''', (key, value))
+    
+    def get_compaction_cutoff(self):
+        cutoffs = [value for value in (self.get_maintenance_value('moves_purged_before'),
+                                       self.get_maintenance_value('games_archived_before')) if value]
+        return max(cutoffs) if cutoffs else None
+    
+    def get_database_size(self):
+        conn = self.connect()
+        cursor = conn.cursor()
+        
+        page_size = cursor.execute('PRAGMA page_size').fetchone()[0]
+        page_count = cursor.execute('PRAGMA page_count').fetchone()[0]
+        free_pages = cursor.execute('PRAGMA freelist_count').fetchone()[0]
+        auto_vacuum = cursor.execute('PRAGMA auto_vacuum').fetchone()[0]
+        conn.close()
+        return {
+            'bytes': page_size * page_count,
+            'free_bytes': page_size * free_pages,
+            'incremental_vacuum': auto_vacuum == 2
+        }
+    
+    def get_old_games(self, cutoff, limit):
+        conn = self.connect()
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            SELECT id, player1_score, player2_score, winner, total_rounds, game_duration,
+                   timestamp, game_mode, end_reason, dice_faces, target_score
+            FROM game_history
+            WHERE timestamp < ?
+            ORDER BY timestamp, id
+            LIMIT ?
+        ''', (cutoff, limit))
+        
+        columns = [column[0] for column in cursor.description]
+        games = []
+        for row in cursor.fetchall():
+            game = dict(zip(columns, row))
+            cursor.execute('''
+                SELECT player, action, dice_result, score_before, score_after, decision_time
+                FROM player_moves WHERE game_id = ? ORDER BY id
+            ''', (game['id'],))
+            game['moves'] = cursor.fetchall()
+            cursor.execute('''
+                SELECT seat, player_id, score, won FROM game_participants
+                WHERE game_id = ? ORDER BY seat
+            ''', (game['id'],))
+            game['participants'] = cursor.fetchall()
+            games.append(game)
+        
+        conn.close()
+        return games
+    
+    def delete_games(self, game_ids, archived_before=None):
+        conn = self.connect()
+        cursor = conn.cursor()
+        
+        rows = [(game_id,) for game_id in game_ids]
+        cursor.executemany('DELETE FROM player_moves WHERE game_id = ?', rows)
+        cursor.executemany('DELETE FROM game_participants WHERE game_id = ?', rows)
+        cursor.executemany('DELETE FROM game_history WHERE id = ?', rows)
+        if archived_before:
+            self.set_maintenance_value(cursor, 'games_archived_before', archived_before)
+        
+        conn.commit()
+        conn.close()
+        return len(rows)
+    
+    def get_old_moves(self, cutoff, limit):
+        conn = self.connect()
+        cursor = conn.cursor()
+        
+        # walks idx_player_moves_timestamp, so only the moves older than the cutoff are read
+        cursor.execute('''
+            SELECT id, game_id, player, action, dice_result, score_before, score_after, decision_time
+            FROM player_moves
+            WHERE timestamp < ?
+            ORDER BY timestamp, id
+            LIMIT ?
+        ''', (cutoff, limit))
+        
+        moves = cursor.fetchall()
+        conn.close()
+        return moves
+    
+    def delete_moves(self, move_ids, purged_before=None):
+        conn = self.connect()
+        cursor = conn.cursor()
+        
+        cursor.executemany('DELETE FROM player_moves WHERE id = ?', [(move_id,) for move_id in move_ids])
+        if purged_before:
+            self.set_maintenance_value(cursor, 'moves_purged_before', purged_before)
+        
+        conn.commit()
+        conn.close()
+        return len(move_ids)
+    
+    def incremental_vacuum(self, pages):
+        conn = self.connect()
+        cursor = conn.cursor()
+        
+        cursor.execute(f'PRAGMA incremental_vacuum({int(pages)})')
+        cursor.fetchall()
+        free_pages = cursor.execute('PRAGMA freelist_count').fetchone()[0]
+        conn.close()
+        return free_pages
+    
+    def enable_incremental_vacuum(self):
+        conn = self.connect()
+        cursor = conn.cursor()
+        
+        cursor.execute('PRAGMA auto_vacuum = INCREMENTAL')
+        cursor.execute('VACUUM')
+        conn.close()
+    
     def save_move(self, game_id, player, action, dice_result, score_before, score_after, decision_time):
-        conn = sqlite3.connect(self.db_path)
+        conn = self.connect()
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -88,37 +852,326 @@ class GameDatabase:
         conn.close()
     
     def get_game_history(self, limit=10):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT * FROM game_history 
+        shard_games = self.query_shards('''
+            SELECT id, player1_score, player2_score, winner, total_rounds,
+                   game_duration, timestamp, game_mode
+            FROM game_history 
             ORDER BY timestamp DESC 
             LIMIT ?
         ''', (limit,))
         
-        games = cursor.fetchall()
-        conn.close()
-        return games
+        if len(shard_games) == 1:
+            return shard_games[0]
+        return list(islice(merge(*shard_games, key=lambda game: game[6], reverse=True), limit))
     
     def get_player_stats(self, player):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
+        # sums instead of averages so the shards can be added together
+        total_games = wins = score_sum = duration_sum = durations = 0
+        for rows in self.query_shards('''
             SELECT COUNT(*) as total_games,
                    SUM(CASE WHEN winner = ? THEN 1 ELSE 0 END) as wins,
-                   AVG(CASE WHEN winner = ? THEN 
+                   SUM(CASE WHEN winner = ? THEN 
                        CASE WHEN ? = 1 THEN player1_score ELSE player2_score END 
-                       ELSE 0 END) as avg_score,
-                   AVG(game_duration) as avg_game_duration
+                       ELSE 0 END) as score_sum,
+                   SUM(game_duration) as duration_sum,
+                   COUNT(game_duration) as durations
             FROM game_history
             WHERE player1_score > 0 OR player2_score > 0
-        ''', (player, player, player))
+        ''', (player, player, player)):
+            row = rows[0]
+            total_games += row[0]
+            wins += row[1] or 0
+            score_sum += row[2] or 0
+            duration_sum += row[3] or 0
+            durations += row[4]
+        
+        if not total_games:
+            return (0, None, None, None)
+        return (total_games, wins, score_sum / total_games,
+                duration_sum / durations if durations else None)
+    
+    def rollup_since(self, period, days):
+        start = datetime.now(timezone.utc) - timedelta(days=days)
+        return self.rollup_buckets(start.strftime('%Y-%m-%d %H:%M:%S'))[period]
+    
+    def get_rollups(self, period='day', days=90):
+        if period not in ROLLUP_PERIODS:
+            raise ValueError(f"Perioada necunoscuta: {period}")
+        
+        buckets = {}
+        for rows in self.query_shards('''
+            SELECT bucket_start, games, player1_wins, player2_wins, draws, total_rounds,
+                   total_duration, exact_wins, busts, one_losses, pass_endings,
+                   moves, total_decision_time
+            FROM game_rollups
+            WHERE period = ? AND bucket_start >= ?
+            ORDER BY bucket_start
+        ''', (period, self.rollup_since(period, days))):
+            for row in rows:
+                totals = buckets.get(row[0])
+                buckets[row[0]] = row[1:] if totals is None else [a + b for a, b in zip(totals, row[1:])]
+        
+        return [self.summarize_rollup(totals, bucket_start=bucket_start)
+                for bucket_start, totals in sorted(buckets.items())]
+    
+    def get_trend_summary(self, days=90, period='day'):
+        if period not in ROLLUP_PERIODS:
+            raise ValueError(f"Perioada necunoscuta: {period}")
+        
+        shard_rows = self.query_shards('''
+            SELECT COALESCE(SUM(games), 0), COALESCE(SUM(player1_wins), 0),
+                   COALESCE(SUM(player2_wins), 0), COALESCE(SUM(draws), 0),
+                   COALESCE(SUM(total_rounds), 0), COALESCE(SUM(total_duration), 0),
+                   COALESCE(SUM(exact_wins), 0), COALESCE(SUM(busts), 0),
+                   COALESCE(SUM(one_losses), 0), COALESCE(SUM(pass_endings), 0),
+                   COALESCE(SUM(moves), 0), COALESCE(SUM(total_decision_time), 0)
+            FROM game_rollups
+            WHERE period = ? AND bucket_start >= ?
+        ''', (period, self.rollup_since(period, days)))
+        
+        row = [sum(values) for values in zip(*(rows[0] for rows in shard_rows))]
+        summary = self.summarize_rollup(row)
+        summary['decision_time_percentiles'] = self.get_decision_time_percentiles(days=days, period=period)
+        return summary
+    
+    def summarize_rollup(self, row, bucket_start=None):
+        (games, p1_wins, p2_wins, draws, total_rounds, total_duration,
+         exact_wins, busts, one_losses, pass_endings, moves, total_decision_time) = row
+        return {
+            'bucket_start': bucket_start,
+            'games': games,
+            'player1_wins': p1_wins,
+            'player2_wins': p2_wins,
+            'draws': draws,
+            'avg_rounds': total_rounds / games if games else 0,
+            'avg_duration': total_duration / games if games else 0,
+            'exact_rate': exact_wins / games * 100 if games else 0,
+            'bust_rate': busts / games * 100 if games else 0,
+            'one_loss_rate': one_losses / games * 100 if games else 0,
+            'pass_rate': pass_endings / games * 100 if games else 0,
+            'moves': moves,
+            'avg_decision_time': total_decision_time / moves if moves else 0
+        }
+    
+    def get_decision_time_percentiles(self, days=90, period='day', percentiles=(50, 90, 99)):
+        counts = {}
+        for rows in self.query_shards('''
+            SELECT bin, SUM(count) FROM decision_time_rollups
+            WHERE period = ? AND bucket_start >= ?
+            GROUP BY bin
+        ''', (period, self.rollup_since(period, days))):
+            for index, count in rows:
+                counts[index] = counts.get(index, 0) + count
+        
+        total = sum(counts.values())
+        result = {}
+        for percentile in percentiles:
+            if not total:
+                result[percentile] = None
+                continue
+            
+            target = percentile / 100 * total
+            cumulative = 0
+            for index in range(len(DECISION_TIME_BINS) + 1):
+                count = counts.get(index, 0)
+                if count and cumulative + count >= target:
+                    lower = DECISION_TIME_BINS[index - 1] if index > 0 else 0.0
+                    if index == len(DECISION_TIME_BINS):
+                        result[percentile] = lower
+                    else:
+                        upper = DECISION_TIME_BINS[index]
+                        result[percentile] = lower + (upper - lower) * (target - cumulative) / count
+                    break
+                cumulative += count
+        return result
+
+class DatabaseWorker:
+    def __init__(self, database):
+        self.database = database
+        self.tasks = queue.Queue()
+        self.results = queue.Queue()
+        self.thread = threading.Thread(target=self.run, name="database-worker", daemon=True)
+        self.thread.start()
+    
+    def submit(self, function, args=(), callback=None, error_callback=None):
+        future = Future()
+        if callback or error_callback:
+            future.add_done_callback(
+                lambda done: self.results.put((done, callback, error_callback)))
+        self.tasks.put((future, function, args))
+        return future
+    
+    def run(self):
+        while True:
+            task = self.tasks.get()
+            if task is None:
+                break
+            
+            future, function, args = task
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(function(*args))
+            except Exception as exc:
+                future.set_exception(exc)
+    
+    def dispatch_results(self, report_exception=None):
+        # called on the Tk thread; callbacks never run on the worker thread
+        while True:
+            try:
+                future, callback, error_callback = self.results.get_nowait()
+            except queue.Empty:
+                break
+            
+            # one failing callback must not keep the rest of the queue from being delivered
+            try:
+                error = future.exception()
+                if error is not None:
+                    if error_callback:
+                        error_callback(error)
+                elif callback:
+                    callback(future.result())
+            except Exception as exc:
+                if report_exception:
+                    report_exception(exc)
+                else:
+                    traceback.print_exc()
+    
+    def shutdown(self, wait=True):
+        self.tasks.put(None)
+        if wait:
+            self.thread.join()
+
+class RetentionPolicy:
+    def __init__(self, move_retention_days=30, game_retention_days=365, max_db_bytes=64 * 1024 * 1024,
+                 archive_dir="dice_archive", batch_size=200, vacuum_pages=256, step_budget=0.05,
+                 max_convert_bytes=8 * 1024 * 1024):
+        self.move_retention_days = move_retention_days
+        self.game_retention_days = game_retention_days
+        self.max_db_bytes = max_db_bytes
+        self.archive_dir = archive_dir
+        self.batch_size = batch_size
+        self.vacuum_pages = vacuum_pages
+        self.step_budget = step_budget
+        # converting to incremental vacuum rewrites the whole file in one step; larger files are
+        # left alone during play and converted only through RetentionManager.enable_incremental_vacuum
+        self.max_convert_bytes = max_convert_bytes
+
+class RetentionManager:
+    MOVE_LOG_NAME = "moves-archive.dlog"
+    
+    def __init__(self, database, policy=None):
+        self.database = database
+        self.policy = policy or RetentionPolicy()
+    
+    def cutoff(self, days):
+        return (datetime.now(timezone.utc) - timedelta(days=days)).strftime('%Y-%m-%d %H:%M:%S')
+    
+    def step(self):
+        # one bounded slice of work; returns True while there is more to do
+        deadline = time.perf_counter() + self.policy.step_budget
+        did_work = False
+        while time.perf_counter() < deadline:
+            if not self.step_once():
+                return did_work
+            did_work = True
+        return True
+    
+    def step_once(self):
+        # every shard file has its own size limit, cutoffs and free pages
+        return any(self.step_shard(shard) for shard in self.database.shards)
+    
+    def enable_incremental_vacuum(self):
+        # explicit, blocking conversion of every shard, whatever its size
+        converted = 0
+        for shard in self.database.shards:
+            if not shard.get_database_size()['incremental_vacuum']:
+                shard.enable_incremental_vacuum()
+                converted += 1
+        return converted
+    
+    def step_shard(self, shard):
+        size = shard.get_database_size()
+        if not size['incremental_vacuum'] and size['bytes'] <= self.policy.max_convert_bytes:
+            shard.enable_incremental_vacuum()
+            return True
+        
+        game_cutoff = self.cutoff(self.policy.game_retention_days)
+        over_limit = size['bytes'] - size['free_bytes'] > self.policy.max_db_bytes
+        if self.archive_games(game_cutoff, force_oldest=over_limit, shard=shard):
+            return True
+        
+        if self.purge_moves(self.cutoff(self.policy.move_retention_days), shard=shard):
+            return True
+        
+        if size['incremental_vacuum'] and size['free_bytes'] > 0:
+            shard.incremental_vacuum(self.policy.vacuum_pages)
+            return True
+        return False
+    
+    def archive_games(self, cutoff, force_oldest=False, shard=None):
+        shard = shard or self.database
+        if force_oldest:
+            # over the size limit: archive the oldest games whatever their age
+            cutoff = '9999-12-31 23:59:59'
+        games = shard.get_old_games(cutoff, self.policy.batch_size)
+        if not games:
+            return 0
+        
+        os.makedirs(self.policy.archive_dir, exist_ok=True)
+        by_month = {}
+        for game in games:
+            by_month.setdefault(game['timestamp'][:7], []).append(game)
+        
+        for month, month_games in by_month.items():
+            path = os.path.join(self.policy.archive_dir, f"games-{month}.jsonl.gz")
+            with open(path, 'ab') as raw:
+                with gzip.GzipFile(fileobj=raw, mode='ab') as archive:
+                    for game in month_games:
+                        archive.write((json.dumps(game) + "\n").encode('utf-8'))
+                raw.flush()
+                os.fsync(raw.fileno())
+        
+        return shard.delete_games([game['id'] for game in games],
+                                  archived_before=games[-1]['timestamp'])
+    
+    def purge_moves(self, cutoff, shard=None):
+        shard = shard or self.database
+        moves = shard.get_old_moves(cutoff, self.policy.batch_size * 10)
+        if not moves:
+            return 0
         
-        stats = cursor.fetchone()
-        conn.close()
-        return stats
+        import move_log
+        
+        os.makedirs(self.policy.archive_dir, exist_ok=True)
+        with move_log.MoveLogWriter(os.path.join(self.policy.archive_dir, self.MOVE_LOG_NAME),
+                                    sync=True) as writer:
+            writer.extend(move[1:] for move in moves)
+        
+        return shard.delete_moves([move[0] for move in moves], purged_before=cutoff)
+    
+    def iter_archived_games(self):
+        seen = set()
+        for path in sorted(glob.glob(os.path.join(self.policy.archive_dir, "games-*.jsonl.gz"))):
+            with gzip.open(path, 'rt', encoding='utf-8') as archive:
+                for line in archive:
+                    game = json.loads(line)
+                    # a crash between writing the archive and deleting the rows can archive a game twice
+                    if game['id'] in seen:
+                        continue
+                    seen.add(game['id'])
+                    yield game
+    
+    def recompute_ratings(self):
+        earlier_games = []
+        for game in self.iter_archived_games():
+            seats = {seat: player_id for seat, player_id, _, _ in game['participants']}
+            if 1 in seats and 2 in seats:
+                earlier_games.append((game['timestamp'], game['id'], seats[1], seats[2], game['winner']))
+        # ids only follow time inside one file; across shards the timestamp decides
+        sharded = len(self.database.shards) > 1
+        earlier_games.sort(key=lambda game: game[:2] if sharded else game[1])
+        return self.database.recompute_ratings(earlier_games)
 
 class ResponsiveDesign:
     def __init__(self, root):
@@ -161,6 +1214,121 @@ class ResponsiveDesign:
     def update_fonts(self):
         pass
 
+@lru_cache(maxsize=32)
+def die_outline(size, angle=0.0):
+    # (region, x, y) per pixel, shared by every face of this size; rotated dice are shrunk to fit the image.
+    # The square looks the same every quarter turn, so callers pass angle % 90 and rotate x, y themselves
+    cos_a, sin_a = math.cos(math.radians(angle)), math.sin(math.radians(angle))
+    half = size * min(0.42, 0.48 / (abs(cos_a) + abs(sin_a)))
+    corner = half * 0.28
+    border = max(1.0, size * 0.03)
+    center = (size - 1) / 2
+    
+    rows = []
+    for py in range(size):
+        row = []
+        for px in range(size):
+            dx, dy = px - center, py - center
+            x = dx * cos_a + dy * sin_a
+            y = dy * cos_a - dx * sin_a
+            # signed distance to the rounded square, negative inside
+            qx, qy = abs(x) - half + corner, abs(y) - half + corner
+            outside = math.hypot(max(qx, 0), max(qy, 0)) + min(max(qx, qy), 0) - corner
+            row.append((0 if outside > 0 else (1 if outside > -border else 2), x, y))
+        rows.append(row)
+    return half, rows
+
+def render_die_face(face, size, angle=0.0, face_color='#ecf0f1', mark_color='#2c3e50',
+                    border_color='#bdc3c7', background='#2c3e50'):
+    # returns PhotoImage.put() data
+    half, outline = die_outline(size, angle % 90)
+    quarter_turns = int(angle // 90) % 4
+    
+    if face in PIP_LAYOUTS:
+        spacing = half * 0.52
+        pip_radius_sq = (half * 0.17) ** 2
+        pips = set(PIP_LAYOUTS[face])
+        
+        def is_mark(x, y):
+            # only the nearest grid point can hold a pip that covers this pixel
+            row, column = round(y / spacing), round(x / spacing)
+            if (row + 1, column + 1) not in pips:
+                return False
+            return (x - column * spacing) ** 2 + (y - row * spacing) ** 2 <= pip_radius_sq
+    else:
+        text = str(face)
+        cell = min(1.5 * half / (4 * len(text) - 1), 1.2 * half / 5)
+        left = -cell * (4 * len(text) - 1) / 2
+        top = -cell * 2.5
+        
+        def is_mark(x, y):
+            column = int((x - left) // cell)
+            row = int((y - top) // cell)
+            if x < left or y < top or row >= 5 or column >= 4 * len(text) or column % 4 == 3:
+                return False
+            return DIGIT_GLYPHS[text[column // 4]][row][column % 4] == '1'
+    
+    if quarter_turns:
+        draw_mark = is_mark
+        
+        def is_mark(x, y):
+            # each quarter turn maps (x, y) to (y, -x) in the die's own frame
+            for _ in range(quarter_turns):
+                x, y = y, -x
+            return draw_mark(x, y)
+    
+    colors = (background, border_color)
+    rows = []
+    for outline_row in outline:
+        row = [colors[region] if region < 2 else (mark_color if is_mark(x, y) else face_color)
+               for region, x, y in outline_row]
+        rows.append("{" + " ".join(row) + "}")
+    return " ".join(rows)
+
+class DiceFaceSet:
+    # faces and roll frames of one die at one size, each rendered the first time it is shown
+    def __init__(self, fete, size):
+        self.fete = fete
+        self.size = size
+        self.faces = {}
+        self.frames = {}
+    
+    def face(self, face):
+        if face not in self.faces:
+            self.faces[face] = self.render(face, 0.0, '#ecf0f1')
+        return self.faces[face]
+    
+    def frame(self, index):
+        if index not in self.frames:
+            self.frames[index] = self.render(1 + index * 5 % self.fete, index * 360 / DICE_ANIMATION_FRAMES,
+                                             '#f39c12')
+        return self.frames[index]
+    
+    def render(self, face, angle, face_color):
+        image = tk.PhotoImage(width=self.size, height=self.size)
+        image.put(render_die_face(face, self.size, angle=angle, face_color=face_color))
+        return image
+
+class DiceFaceCache:
+    def __init__(self, max_sizes=8):
+        self.max_sizes = max_sizes
+        self.sets = {}
+    
+    def image_size(self, scale_factor):
+        # snapped to DICE_SIZE_STEP so dragging the window edge does not re-render on every pixel
+        size = int(DICE_IMAGE_SIZE * scale_factor / DICE_SIZE_STEP + 0.5) * DICE_SIZE_STEP
+        return max(DICE_SIZE_STEP * 4, size)
+    
+    def get(self, fete, scale_factor):
+        key = (fete, self.image_size(scale_factor))
+        images = self.sets.pop(key, None)
+        if images is None:
+            images = DiceFaceSet(*key)
+        self.sets[key] = images
+        while len(self.sets) > self.max_sizes:
+            del self.sets[next(iter(self.sets))]
+        return images
+
 class PerformanceMetrics:
     def __init__(self):
         self.decision_times = []
@@ -212,6 +1380,76 @@ class PerformanceMetrics:
             'total_rolls': self.total_rolls,
             'total_decisions': len(self.decision_times)
         }
+    
+    def to_dict(self):
+        now = time.time()
+        return {
+            'elapsed': now - self.game_start_time if self.game_start_time else None,
+            'decision_times': list(self.decision_times),
+            'total_rolls': self.total_rolls,
+            'successful_rolls': self.successful_rolls,
+            'risk_actions': self.risk_actions,
+            'safe_actions': self.safe_actions
+        }
+    
+    @classmethod
+    def from_dict(cls, data):
+        metrics = cls()
+        now = time.time()
+        if data.get('elapsed') is not None:
+            metrics.game_start_time = now - data['elapsed']
+            metrics.last_action_time = now
+        metrics.decision_times = list(data.get('decision_times', []))
+        metrics.total_rolls = data.get('total_rolls', 0)
+        metrics.successful_rolls = data.get('successful_rolls', 0)
+        metrics.risk_actions = data.get('risk_actions', 0)
+        metrics.safe_actions = data.get('safe_actions', 0)
+        return metrics
+
+class SessionCheckpoint:
+    VERSION = 1
+    
+    def __init__(self, path="dice_game_session.json", durable=False):
+        self.path = path
+        self.durable = durable
+        self.last_payload = None
+    
+    def save(self, state):
+        # elapsed time changes on every call, so it is left out of the change check
+        comparable = dict(state, metrics=dict(state.get('metrics', {}), elapsed=None))
+        fingerprint = json.dumps(comparable, sort_keys=True)
+        if fingerprint == self.last_payload:
+            return False
+        
+        data = json.dumps({'version': self.VERSION, 'state': state})
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(data)
+            if self.durable:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        
+        self.last_payload = fingerprint
+        return True
+    
+    def load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        
+        if not isinstance(data, dict) or data.get('version') != self.VERSION:
+            return None
+        return data.get('state')
+    
+    def clear(self):
+        self.last_payload = None
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
 
 class Dice:
     def __init__(self, fete=6, numar_zaruri=1):
@@ -235,6 +1473,225 @@ class Dice:
                 results.append(random.randint(1, self.fete))
             return results
 
+class RuleVariant:
+    def __init__(self, name, label, description, fatal_faces=(1,), overshoot='bust',
+                 dice_count=1, doubles_bonus=0, pass_rule='higher_score'):
+        if overshoot not in ('bust', 'bounce'):
+            raise ValueError(f"Regula de depasire necunoscuta: {overshoot}")
+        if pass_rule not in ('higher_score', 'never'):
+            raise ValueError(f"Regula de pasare necunoscuta: {pass_rule}")
+        
+        self.name = name
+        self.label = label
+        self.description = description
+        self.fatal_faces = frozenset(fatal_faces)
+        self.overshoot = overshoot
+        self.dice_count = max(1, dice_count)
+        self.doubles_bonus = doubles_bonus
+        self.pass_rule = pass_rule
+    
+    def compile(self, fete, target_score):
+        return CompiledRules(self, fete, target_score)
+
+class CompiledRules:
+    FATAL = -1
+    
+    def __init__(self, variant, fete, target_score):
+        self.variant = variant
+        self.name = variant.name
+        self.fete = fete
+        self.target_score = target_score
+        self.dice_count = variant.dice_count
+        self.pass_rule = variant.pass_rule
+        self.doubles_bonus = variant.doubles_bonus if variant.dice_count > 1 else 0
+        
+        # face -> points, or FATAL; index 0 is unused
+        self.face_effect = tuple(
+            self.FATAL if face in variant.fatal_faces else face
+            for face in range(fete + 1)
+        )
+        
+        # raw score after adding points -> (new score, outcome)
+        max_score = target_score + fete * variant.dice_count + self.doubles_bonus
+        self.transition = tuple(self.resolve(raw_score) for raw_score in range(max_score + 1))
+    
+    def resolve(self, raw_score):
+        if raw_score < self.target_score:
+            return (raw_score, None)
+        if raw_score == self.target_score:
+            return (raw_score, 'exact')
+        if self.variant.overshoot == 'bounce':
+            return (max(0, 2 * self.target_score - raw_score), None)
+        return (raw_score, 'bust')
+    
+    def fatal_face(self, faces):
+        for face in faces:
+            if self.face_effect[face] == self.FATAL:
+                return face
+        return None
+    
+    def points(self, faces):
+        total = 0
+        for face in faces:
+            total += self.face_effect[face]
+        if self.doubles_bonus and len(set(faces)) == 1:
+            total += self.doubles_bonus
+        return total
+    
+    def apply(self, score, points):
+        raw_score = score + points
+        if raw_score < len(self.transition):
+            return self.transition[raw_score]
+        return self.resolve(raw_score)
+    
+    def pass_ends_game(self, score, opponent_score, opponent_passed):
+        # a second pass in a row settles the game by score even if someone is still at 0
+        if self.pass_rule != 'higher_score':
+            return False
+        return opponent_passed or (score > 0 and opponent_score > 0)
+
+RULE_VARIANTS = {
+    'standard': RuleVariant(
+        'standard', "Standard",
+        "1 pierde, depasirea tintei pierde, pasare cu departajare la scor; doua pasari la rand incheie jocul."),
+    'revenire': RuleVariant(
+        'revenire', "Revenire",
+        "Depasirea tintei te intoarce inapoi cu diferenta in loc sa pierzi.",
+        overshoot='bounce'),
+    'dublu': RuleVariant(
+        'dublu', "Doua zaruri",
+        "Se arunca doua zaruri; o dubla aduce 5 puncte bonus, orice 1 pierde.",
+        dice_count=2, doubles_bonus=5),
+    'fara_pasare': RuleVariant(
+        'fara_pasare', "Fara departajare",
+        "Pasarea doar trece randul; jocul se termina doar prin aruncari.",
+        pass_rule='never'),
+}
+
+def compile_rules(game_mode, fete, target_score):
+    variant = RULE_VARIANTS.get(game_mode, RULE_VARIANTS['standard'])
+    return variant.compile(fete, target_score)
+
+class GamePolicy:
+    _cache = {}
+    
+    def __init__(self, rules):
+        self.target_score = rules.target_score
+        self.fatal_probability, self.point_probabilities = self.roll_distribution(rules)
+        self.rules = rules
+        states = self.target_score * self.target_score
+        self.solved = states <= MAX_POLICY_STATES and states * len(self.point_probabilities) <= MAX_POLICY_WORK
+        # one bit per (opponent just passed, my score, opponent score): 1 = roll, 0 = pass;
+        # only allocated for targets small enough to solve, larger ones use heuristic_roll
+        self.policy = None
+        if self.solved:
+            self.policy = bytearray((2 * self.target_score * self.target_score + 7) // 8)
+            self.solve()
+    
+    @classmethod
+    def for_rules(cls, rules):
+        key = (rules.name, rules.fete, rules.target_score)
+        if key not in cls._cache:
+            cls._cache[key] = cls(rules)
+        return cls._cache[key]
+    
+    @classmethod
+    def cached(cls, rules):
+        return cls._cache.get((rules.name, rules.fete, rules.target_score))
+    
+    @staticmethod
+    def roll_distribution(rules):
+        outcomes = rules.fete ** rules.dice_count
+        fatal = 0
+        points = {}
+        for faces in product(range(1, rules.fete + 1), repeat=rules.dice_count):
+            if rules.fatal_face(faces) is not None:
+                fatal += 1
+            else:
+                value = rules.points(faces)
+                points[value] = points.get(value, 0) + 1
+        return fatal / outcomes, [(value, count / outcomes) for value, count in sorted(points.items())]
+    
+    def state_index(self, score, opponent_score, opponent_passed):
+        return (opponent_passed * self.target_score + score) * self.target_score + opponent_score
+    
+    def action_values(self, values, score, opponent_score, opponent_passed):
+        roll_value = 0.0
+        for points, probability in self.point_probabilities:
+            new_score, outcome = self.rules.apply(score, points)
+            if outcome == 'exact':
+                roll_value += probability
+            elif outcome is None:
+                roll_value += probability * POLICY_DISCOUNT * (
+                    1 - values[self.state_index(opponent_score, new_score, 0)])
+        
+        if self.rules.pass_ends_game(score, opponent_score, opponent_passed):
+            pass_value = 1.0 if score > opponent_score else (0.5 if score == opponent_score else 0.0)
+        elif opponent_passed:
+            # answering a pass with a pass can go on forever when passes never end the game;
+            # play that does not finish counts as a loss, so after a pass the computer rolls
+            pass_value = 0.0
+        else:
+            # the opponent gets the same position with the roles swapped
+            pass_value = POLICY_DISCOUNT * (1 - values[self.state_index(opponent_score, score, 1)])
+        return roll_value, pass_value
+    
+    def solve(self, tolerance=1e-9, max_sweeps=1000):
+        # value iteration: passing and bounce-back make the state graph cyclic
+        target = self.target_score
+        states = list(product((0, 1), range(target), range(target)))
+        values = [0.5] * (2 * target * target)
+        for _ in range(max_sweeps):
+            change = 0.0
+            for opponent_passed, score, opponent_score in states:
+                index = self.state_index(score, opponent_score, opponent_passed)
+                best = max(self.action_values(values, score, opponent_score, opponent_passed))
+                change = max(change, abs(best - values[index]))
+                values[index] = best
+            if change < tolerance:
+                break
+        
+        for opponent_passed, score, opponent_score in states:
+            roll_value, pass_value = self.action_values(values, score, opponent_score, opponent_passed)
+            if roll_value >= pass_value:
+                index = self.state_index(score, opponent_score, opponent_passed)
+                self.policy[index >> 3] |= 1 << (index & 7)
+    
+    def should_roll(self, score, opponent_score, opponent_passed=False):
+        target = self.target_score
+        if not self.solved or score >= target or opponent_score >= target:
+            return self.heuristic_roll(score)
+        index = self.state_index(score, opponent_score, int(opponent_passed))
+        return bool(self.policy[index >> 3] & (1 << (index & 7)))
+    
+    def heuristic_roll(self, score):
+        risk = self.fatal_probability
+        for points, probability in self.point_probabilities:
+            if self.rules.apply(score, points)[1] == 'bust':
+                risk += probability
+        return risk < 0.4
+
+class ComputerPlayer:
+    def __init__(self, seat, level, rules, solve=True):
+        self.seat = seat
+        self.level = level if level in COMPUTER_LEVELS else 'greu'
+        self.noise = COMPUTER_LEVELS[self.level][1]
+        self.set_rules(rules, solve)
+    
+    @property
+    def name(self):
+        return COMPUTER_NAMES[self.level]
+    
+    def set_rules(self, rules, solve=True):
+        # with solve=False the policy stays None until the caller supplies one
+        self.rules = rules
+        self.policy = GamePolicy.for_rules(rules) if solve else GamePolicy.cached(rules)
+    
+    def choose_action(self, score, opponent_score, opponent_passed=False):
+        if self.noise and random.random() < self.noise:
+            return random.choice(("roll", "pass"))
+        return "roll" if self.policy.should_roll(score, opponent_score, opponent_passed) else "pass"
+
 class DiceGameGUI:
     def __init__(self, root):
         self.root = root
@@ -244,22 +1701,100 @@ class DiceGameGUI:
         
         self.responsive = ResponsiveDesign(root)
         self.database = GameDatabase()
+        self.database_worker = DatabaseWorker(self.database)
+        self.retention = RetentionManager(self.database)
+        self.last_activity = time.time()
+        self.maintenance_job = None
         self.metrics = PerformanceMetrics()
+        self.checkpoint = SessionCheckpoint()
+        self.dice_images = DiceFaceCache()
+        self.shown_faces = None
+        self.dice_resize_job = None
         
         self.dice = Dice()
         self.player_score1 = 0
         self.player_score2 = 0
         self.current_player = 1
         self.target_score = 21
+        self.game_mode = 'standard'
+        self.player_names = list(DEFAULT_PLAYER_NAMES)
+        self.human_player_name = DEFAULT_PLAYER_NAMES[1]
+        self.rules = compile_rules(self.game_mode, self.dice.fete, self.target_score)
+        self.computer = None
+        self.computer_job = None
         self.game_over = False
         self.current_game_id = None
         self.round_count = 0
+        self.pending_moves = []
+        # finished games the worker has not committed yet; they ride along in the checkpoint
+        self.unsaved_games = []
         
         self.create_menu()
         self.setup_styles()
         self.create_widgets()
         self.update_display()
+        self.restore_session()
+        
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.poll_database_results()
+        self.schedule_maintenance(MAINTENANCE_CHECK_INTERVAL)
         
+    def poll_database_results(self):
+        try:
+            self.database_worker.dispatch_results(self.report_callback_error)
+        finally:
+            self.root.after(DB_POLL_INTERVAL, self.poll_database_results)
+    
+    def report_callback_error(self, error):
+        traceback.print_exc()
+        try:
+            self.status_label.config(text=f"Eroare interna: {error}")
+        except tk.TclError:
+            pass
+    
+    def run_database_task(self, function, args=(), callback=None, window=None, on_error=None):
+        def deliver(result):
+            if window is None or window.winfo_exists():
+                callback(result)
+        
+        def report_error(error):
+            self.status_label.config(text=f"Eroare baza de date: {error}")
+            if window is not None and window.winfo_exists():
+                messagebox.showerror("Eroare", f"Eroare baza de date:\n{error}", parent=window)
+            if on_error:
+                on_error(error)
+        
+        return self.database_worker.submit(function, args,
+                                           callback=deliver if callback else None,
+                                           error_callback=report_error)
+    
+    def schedule_maintenance(self, delay):
+        self.maintenance_job = self.root.after(delay, self.run_maintenance)
+    
+    def run_maintenance(self):
+        self.maintenance_job = None
+        game_in_progress = self.metrics.game_start_time and not self.game_over
+        if game_in_progress or time.time() - self.last_activity < MAINTENANCE_IDLE_SECONDS:
+            self.schedule_maintenance(MAINTENANCE_CHECK_INTERVAL)
+            return
+        
+        self.run_database_task(self.retention.step, callback=self.on_maintenance_step,
+                               on_error=lambda error: self.on_maintenance_step(False))
+    
+    def on_maintenance_step(self, more_work):
+        delay = MAINTENANCE_STEP_INTERVAL if more_work else MAINTENANCE_CHECK_INTERVAL
+        self.schedule_maintenance(delay)
+    
+    def on_close(self):
+        if self.maintenance_job is not None:
+            self.root.after_cancel(self.maintenance_job)
+        if self.dice_resize_job is not None:
+            self.root.after_cancel(self.dice_resize_job)
+        self.cancel_computer_move()
+        self.status_label.config(text="Se salveaza...")
+        self.database_worker.shutdown(wait=True)
+        self.root.destroy()
+    
     def create_menu(self):
         menubar = tk.Menu(self.root)
         self.root.config(menu=menubar)
@@ -269,12 +1804,14 @@ class DiceGameGUI:
         game_menu.add_command(label="Joc Nou", command=self.new_game)
         game_menu.add_command(label="Setari", command=self.show_settings)
         game_menu.add_separator()
-        game_menu.add_command(label="Iesire", command=self.root.quit)
+        game_menu.add_command(label="Iesire", command=self.on_close)
         
         history_menu = tk.Menu(menubar, tearoff=0)
         menubar.add_cascade(label="Istoric", menu=history_menu)
         history_menu.add_command(label="Istoricul Jocurilor", command=self.show_game_history)
         history_menu.add_command(label="Statistici Performance", command=self.show_performance_stats)
+        history_menu.add_command(label="Clasament", command=self.show_leaderboard)
+        history_menu.add_command(label="Analiza Distributiei", command=self.show_distribution_analysis)
         
         help_menu = tk.Menu(menubar, tearoff=0)
         menubar.add_cascade(label="Ajutor", menu=help_menu)
@@ -325,7 +1862,7 @@ class DiceGameGUI:
         self.player1_frame = tk.Frame(players_frame, bg='#27ae60', relief='raised', bd=3)
         self.player1_frame.pack(side='left', fill='x', expand=True, padx=(0, 5))
         
-        self.player1_title = tk.Label(self.player1_frame, text="JUCATOR 1", 
+        self.player1_title = tk.Label(self.player1_frame, text=self.player_names[0].upper(), 
                                      font=self.responsive.get_scaled_font_bold('subtitle'),
                                      fg='white', bg='#27ae60')
         self.player1_title.pack(pady=5)
@@ -338,7 +1875,7 @@ class DiceGameGUI:
         self.player2_frame = tk.Frame(players_frame, bg='#3498db', relief='raised', bd=3)
         self.player2_frame.pack(side='right', fill='x', expand=True, padx=(5, 0))
         
-        self.player2_title = tk.Label(self.player2_frame, text="JUCATOR 2", 
+        self.player2_title = tk.Label(self.player2_frame, text=self.player_names[1].upper(), 
                                      font=self.responsive.get_scaled_font_bold('subtitle'),
                                      fg='white', bg='#3498db')
         self.player2_title.pack(pady=5)
@@ -357,10 +1894,14 @@ class DiceGameGUI:
                                            fg='#ecf0f1', bg='#2c3e50')
         self.current_player_label.pack(pady=10)
         
-        self.dice_display = tk.Label(dice_frame, text="🎲", 
+        self.dice_row = tk.Frame(dice_frame, bg='#2c3e50')
+        self.dice_row.pack()
+        
+        self.dice_display = tk.Label(self.dice_row, text="🎲", 
                                    font=('Arial', 48), 
                                    fg='#ecf0f1', bg='#2c3e50')
-        self.dice_display.pack()
+        self.dice_display.pack(side='left')
+        self.extra_dice_labels = []
         
         self.result_label = tk.Label(dice_frame, text="", 
                                    font=self.responsive.get_scaled_font('normal'),
@@ -461,6 +2002,16 @@ class DiceGameGUI:
                 widget.config(font=self.responsive.get_scaled_font_bold(font_type))
             else:
                 widget.config(font=self.responsive.get_scaled_font(font_type))
+        
+        # <Configure> fires on every step of a drag; the dice are redrawn once the size settles
+        if self.dice_resize_job is not None:
+            self.root.after_cancel(self.dice_resize_job)
+        self.dice_resize_job = self.root.after(DICE_RESIZE_DELAY, self.refresh_dice_faces)
+    
+    def refresh_dice_faces(self):
+        self.dice_resize_job = None
+        if self.shown_faces:
+            self.show_dice_faces(self.shown_faces)
     
     def roll_dice(self):
         if self.game_over:
@@ -476,49 +2027,46 @@ class DiceGameGUI:
         self.animate_dice_roll()
         
         result = self.dice.roll()
+        faces = result if isinstance(result, list) else [result]
         
-        if result == 1:
-            self.dice_display.config(text="💀")
-            self.result_label.config(text="GHINION! Ai nimerit 1!", fg='#e74c3c')
+        fatal_face = self.rules.fatal_face(faces)
+        if fatal_face is not None:
+            self.show_dice_text("💀")
+            self.result_label.config(text=f"GHINION! Ai nimerit {fatal_face}!", fg='#e74c3c')
             winner = 2 if self.current_player == 1 else 1
             
-            if self.current_game_id:
-                self.database.save_move(self.current_game_id, self.current_player, "roll", 1, 
-                                      score_before, score_before, 0)
+            self.record_move("roll", sum(faces), score_before, score_before)
             
-            self.end_game(f"Jucatorul {winner} castiga!\nJucatorul {self.current_player} a nimerit 1!")
+            self.end_game(f"Jucatorul {winner} castiga!\nJucatorul {self.current_player} a nimerit {fatal_face}!",
+                          'rolled_one')
             return
         
-        self.dice_display.config(text=self.get_dice_emoji(result))
-        self.result_label.config(text=f"Ai aruncat: {result}", fg='#2ecc71')
+        self.show_dice_faces(faces)
+        self.result_label.config(text=f"Ai aruncat: {' + '.join(str(face) for face in faces)}", fg='#2ecc71')
         self.metrics.record_successful_roll()
         
-        if isinstance(result, list):
-            points = sum(result)
-        else:
-            points = result
-            
-        self.add_points(points)
-        score_after = self.get_current_score()
+        points = self.rules.points(faces)
+        score_after, outcome = self.rules.apply(score_before, points)
+        self.set_current_score(score_after)
         
-        if self.current_game_id:
-            decision_time = self.metrics.decision_times[-1] if self.metrics.decision_times else 0
-            self.database.save_move(self.current_game_id, self.current_player, "roll", result,
-                                  score_before, score_after, decision_time)
+        self.record_move("roll", sum(faces), score_before, score_after)
         
-        if score_after > self.target_score:
+        if outcome == 'bust':
             winner = 2 if self.current_player == 1 else 1
-            self.end_game(f"Jucatorul {winner} castiga!\nJucatorul {self.current_player} a depasit {self.target_score}!")
+            self.end_game(f"Jucatorul {winner} castiga!\nJucatorul {self.current_player} a depasit {self.target_score}!",
+                          'bust')
             return
             
-        if score_after == self.target_score:
-            self.end_game(f"Jucatorul {self.current_player} castiga!\nScor perfect: {self.target_score}!")
+        if outcome == 'exact':
+            self.end_game(f"Jucatorul {self.current_player} castiga!\nScor perfect: {self.target_score}!",
+                          'exact')
             return
         
         self.round_count += 1
         self.switch_player()
         self.update_display()
         self.update_live_metrics()
+        self.save_checkpoint()
     
     def pass_turn(self):
         if self.game_over:
@@ -532,24 +2080,32 @@ class DiceGameGUI:
         
         self.result_label.config(text=f"Jucatorul {self.current_player} a pasat randul", fg='#f39c12')
         
-        if self.current_game_id:
-            decision_time = self.metrics.decision_times[-1] if self.metrics.decision_times else 0
-            self.database.save_move(self.current_game_id, self.current_player, "pass", 0,
-                                  score_before, score_before, decision_time)
+        opponent_passed = self.opponent_passed()
+        self.record_move("pass", 0, score_before, score_before)
         
-        if self.player_score1 > 0 and self.player_score2 > 0:
+        if self.rules.pass_ends_game(self.player_score1, self.player_score2, opponent_passed):
             if self.player_score1 > self.player_score2:
-                self.end_game(f"Jucatorul 1 castiga cu scorul {self.player_score1}!")
+                self.end_game(f"Jucatorul 1 castiga cu scorul {self.player_score1}!", 'pass')
             elif self.player_score2 > self.player_score1:
-                self.end_game(f"Jucatorul 2 castiga cu scorul {self.player_score2}!")
+                self.end_game(f"Jucatorul 2 castiga cu scorul {self.player_score2}!", 'pass')
             else:
-                self.end_game("Egalitate!")
+                self.end_game("Egalitate!", 'pass')
             return
         
         self.round_count += 1
         self.switch_player()
         self.update_display()
         self.update_live_metrics()
+        self.save_checkpoint()
+    
+    def opponent_passed(self):
+        return bool(self.pending_moves) and self.pending_moves[-1][1] == "pass"
+    
+    def record_move(self, action, dice_result, score_before, score_after):
+        self.last_activity = time.time()
+        decision_time = self.metrics.decision_times[-1] if self.metrics.decision_times else 0
+        self.pending_moves.append((self.current_player, action, dice_result,
+                                   score_before, score_after, decision_time))
     
     def update_live_metrics(self):
         metrics = self.metrics.get_metrics()
@@ -562,15 +2118,38 @@ class DiceGameGUI:
         seconds = int(metrics['game_duration'] % 60)
         self.game_time_label.config(text=f"Timp: {minutes}:{seconds:02d}")
     
-    def get_dice_emoji(self, value):
-        dice_emojis = {1: "⚀", 2: "⚁", 3: "⚂", 4: "⚃", 5: "⚄", 6: "⚅"}
-        return dice_emojis.get(value, "🎲")
+    def current_dice_images(self):
+        return self.dice_images.get(self.dice.fete, self.responsive.scale_factor)
+    
+    def show_dice_faces(self, faces):
+        images = self.current_dice_images()
+        self.shown_faces = list(faces)
+        self.dice_display.config(image=images.face(faces[0]), text="")
+        
+        while len(self.extra_dice_labels) < len(faces) - 1:
+            self.extra_dice_labels.append(tk.Label(self.dice_row, bg='#2c3e50'))
+        for index, label in enumerate(self.extra_dice_labels, start=1):
+            if index < len(faces):
+                label.config(image=images.face(faces[index]))
+                label.pack(side='left', padx=5)
+            else:
+                label.pack_forget()
+    
+    def show_dice_text(self, text):
+        self.shown_faces = None
+        self.dice_display.config(image='', text=text)
+        for label in self.extra_dice_labels:
+            label.pack_forget()
     
     def animate_dice_roll(self):
-        for i in range(8):
-            self.dice_display.config(text="🎲" if i % 2 == 0 else "🎯")
+        self.show_dice_text("")
+        images = self.current_dice_images()
+        for index in range(DICE_ANIMATION_FRAMES):
+            # a frame not drawn yet is rendered inside its own delay instead of adding to it
+            started = time.perf_counter()
+            self.dice_display.config(image=images.frame(index))
             self.root.update()
-            time.sleep(0.08)
+            time.sleep(max(0.0, DICE_ANIMATION_DELAY - (time.perf_counter() - started)))
     
     def switch_player(self):
         self.current_player = 2 if self.current_player == 1 else 1
@@ -584,6 +2163,12 @@ class DiceGameGUI:
         else:
             self.player_score2 += points
     
+    def set_current_score(self, score):
+        if self.current_player == 1:
+            self.player_score1 = score
+        else:
+            self.player_score2 = score
+    
     def update_display(self):
         self.player1_score_label.config(text=f"Scor: {self.player_score1}")
         self.player2_score_label.config(text=f"Scor: {self.player_score2}")
@@ -606,8 +2191,43 @@ class DiceGameGUI:
             self.player2_score_label.config(bg='#e74c3c')
         
         self.status_label.config(text=f"Jucatorul {self.current_player} - Aleg actiunea...")
+        self.schedule_computer_move()
+    
+    def is_computer_turn(self):
+        return (self.computer is not None and not self.game_over
+                and self.current_player == self.computer.seat)
+    
+    def schedule_computer_move(self):
+        computer_turn = self.is_computer_turn()
+        state = 'disabled' if computer_turn or self.game_over else 'normal'
+        self.roll_button.config(state=state)
+        self.pass_button.config(state=state)
+        
+        if computer_turn and self.computer.policy is None:
+            # on_policy_ready calls back here once the worker has solved the rules
+            self.status_label.config(text=f"{self.computer.name} se pregateste...")
+        elif computer_turn and self.computer_job is None:
+            self.status_label.config(text=f"{self.computer.name} se gandeste...")
+            self.computer_job = self.root.after(COMPUTER_MOVE_DELAY, self.computer_move)
+    
+    def cancel_computer_move(self):
+        if self.computer_job is not None:
+            self.root.after_cancel(self.computer_job)
+            self.computer_job = None
     
-    def end_game(self, message):
+    def computer_move(self):
+        self.computer_job = None
+        if not self.is_computer_turn() or self.computer.policy is None:
+            return
+        
+        opponent_score = self.player_score2 if self.current_player == 1 else self.player_score1
+        action = self.computer.choose_action(self.get_current_score(), opponent_score, self.opponent_passed())
+        if action == "roll":
+            self.roll_dice()
+        else:
+            self.pass_turn()
+    
+    def end_game(self, message, end_reason=None):
         self.game_over = True
         metrics = self.metrics.get_metrics()
         
@@ -615,12 +2235,18 @@ class DiceGameGUI:
         if "Egalitate" in message:
             winner = 0
         
-        self.current_game_id = self.database.save_game(
-            self.player_score1, self.player_score2, winner, 
-            self.round_count, metrics['game_duration']
+        game = (
+            self.player_score1, self.player_score2, winner,
+            self.round_count, metrics['game_duration'],
+            list(self.pending_moves), end_reason, self.game_mode, list(self.player_names),
+            self.dice.fete, self.target_score
         )
+        # the checkpoint is only dropped once the worker has committed the game
+        self.unsaved_games.append(game)
+        self.save_checkpoint()
+        self.submit_finished_game(game)
         
-        self.dice_display.config(text="🏆")
+        self.show_dice_text("🏆")
         self.result_label.config(text="JOC TERMINAT!", fg='#f1c40f')
         self.status_label.config(text="Joc terminat")
         
@@ -629,17 +2255,48 @@ class DiceGameGUI:
         self.roll_button.config(state='disabled')
         self.pass_button.config(state='disabled')
     
+    def save_finished_game(self, player1_score, player2_score, winner, total_rounds, game_duration,
+                           moves, end_reason, game_mode, player_names, dice_faces, target_score):
+        return self.database.save_game(
+            player1_score, player2_score, winner, total_rounds, game_duration,
+            moves=moves, end_reason=end_reason, game_mode=game_mode,
+            player_ids=self.saved_player_ids(player_names),
+            dice_faces=dice_faces, target_score=target_score
+        )
+    
+    def saved_player_ids(self, player_names):
+        player_ids = [None if name in DEFAULT_PLAYER_NAMES else self.database.get_or_create_player(name)
+                      for name in player_names]
+        return player_ids if any(player_ids) else None
+    
+    def known_player_ids(self, player_names):
+        # read-only lookup: opening a dialog must not create players
+        return [None if name in DEFAULT_PLAYER_NAMES else self.database.find_player(name)
+                for name in player_names]
+    
+    def submit_finished_game(self, game):
+        self.run_database_task(self.save_finished_game, game,
+                               callback=lambda game_id: self.on_game_saved(game, game_id))
+    
+    def on_game_saved(self, game, game_id):
+        if self.game_over and self.unsaved_games[-1] is game:
+            self.current_game_id = game_id
+        self.unsaved_games.remove(game)
+        self.save_checkpoint()
+    
     def new_game(self):
+        self.cancel_computer_move()
         self.player_score1 = 0
         self.player_score2 = 0
         self.current_player = 1
         self.game_over = False
         self.current_game_id = None
         self.round_count = 0
+        self.pending_moves = []
         
         self.metrics = PerformanceMetrics()
         
-        self.dice_display.config(text="🎲")
+        self.show_dice_text("🎲")
         self.result_label.config(text="")
         self.status_label.config(text="Joc nou inceput")
         
@@ -651,12 +2308,85 @@ class DiceGameGUI:
         self.roll_button.config(state='normal')
         self.pass_button.config(state='normal')
         
+        if self.unsaved_games:
+            self.save_checkpoint()
+        else:
+            self.checkpoint.clear()
+        self.update_display()
+    
+    def get_session_state(self):
+        return {
+            'player_score1': self.player_score1,
+            'player_score2': self.player_score2,
+            'current_player': self.current_player,
+            'round_count': self.round_count,
+            'target_score': self.target_score,
+            'dice_faces': self.dice.fete,
+            'game_mode': self.game_mode,
+            'player_names': self.player_names,
+            'computer_level': self.computer.level if self.computer else None,
+            'pending_moves': self.pending_moves,
+            'metrics': self.metrics.to_dict(),
+            'game_over': self.game_over,
+            'unsaved_games': self.unsaved_games
+        }
+    
+    def set_player_names(self, names):
+        names = [str(name).strip() for name in names]
+        self.player_names = names
+        self.player1_title.config(text=self.player_names[0].upper())
+        self.player2_title.config(text=self.player_names[1].upper())
+    
+    def save_checkpoint(self):
+        if self.game_over and not self.unsaved_games:
+            self.checkpoint.clear()
+            return
+        try:
+            self.checkpoint.save(self.get_session_state())
+        except OSError:
+            self.status_label.config(text="Checkpoint-ul sesiunii nu a putut fi salvat")
+    
+    def restore_session(self):
+        state = self.checkpoint.load()
+        if not state:
+            return
+        
+        try:
+            # games that ended before they reached the database are saved again
+            self.unsaved_games = [tuple(game) for game in state.get('unsaved_games', [])]
+            for game in self.unsaved_games:
+                self.submit_finished_game(game)
+            
+            self.player_score1 = int(state['player_score1'])
+            self.player_score2 = int(state['player_score2'])
+            self.current_player = int(state['current_player'])
+            self.round_count = int(state['round_count'])
+            self.target_score = int(state['target_score'])
+            self.game_mode = state.get('game_mode', 'standard')
+            self.set_player_names(state.get('player_names', self.player_names))
+            self.apply_rules(int(state['dice_faces']))
+            self.set_computer(state.get('computer_level'))
+            self.pending_moves = [tuple(move) for move in state.get('pending_moves', [])]
+            self.metrics = PerformanceMetrics.from_dict(state.get('metrics', {}))
+        except (KeyError, TypeError, ValueError):
+            self.checkpoint.clear()
+            self.new_game()
+            return
+        
+        if state.get('game_over'):
+            # only kept for its unsaved games; the settings carry over to a fresh game
+            self.new_game()
+            return
+        
         self.update_display()
+        if self.metrics.game_start_time:
+            self.update_live_metrics()
+        self.status_label.config(text=f"Joc reluat - Jucatorul {self.current_player} la rand")
     
     def show_settings(self):
         settings_window = tk.Toplevel(self.root)
         settings_window.title("Setari Joc")
-        settings_window.geometry("400x300")
+        settings_window.geometry("400x490")
         settings_window.configure(bg='#2c3e50')
         settings_window.transient(self.root)
         settings_window.grab_set()
@@ -688,6 +2418,49 @@ class DiceGameGUI:
         dice_entry = tk.Entry(dice_frame, textvariable=self.dice_faces_var, width=10)
         dice_entry.pack(side='left', padx=10)
         
+        self.player_name_vars = []
+        for seat, name in enumerate(self.player_names, start=1):
+            name_frame = tk.Frame(settings_window, bg='#2c3e50')
+            name_frame.pack(pady=5)
+            
+            tk.Label(name_frame, text=f"Nume jucator {seat}:", 
+                     font=self.responsive.get_scaled_font('normal'),
+                     fg='#ecf0f1', bg='#2c3e50').pack(side='left')
+            
+            name_var = tk.StringVar(value=name)
+            tk.Entry(name_frame, textvariable=name_var, width=18).pack(side='left', padx=10)
+            self.player_name_vars.append(name_var)
+        
+        variant_frame = tk.Frame(settings_window, bg='#2c3e50')
+        variant_frame.pack(pady=10)
+        
+        tk.Label(variant_frame, text="Varianta:", 
+                 font=self.responsive.get_scaled_font('normal'),
+                 fg='#ecf0f1', bg='#2c3e50').pack(side='left')
+        
+        self.variant_names = {variant.label: name for name, variant in RULE_VARIANTS.items()}
+        self.variant_var = tk.StringVar(value=RULE_VARIANTS[self.game_mode].label)
+        variant_combo = ttk.Combobox(variant_frame, textvariable=self.variant_var,
+                                     values=list(self.variant_names), state='readonly', width=18)
+        variant_combo.pack(side='left', padx=10)
+        
+        opponent_frame = tk.Frame(settings_window, bg='#2c3e50')
+        opponent_frame.pack(pady=10)
+        
+        tk.Label(opponent_frame, text="Jucator 2:", 
+                 font=self.responsive.get_scaled_font('normal'),
+                 fg='#ecf0f1', bg='#2c3e50').pack(side='left')
+        
+        self.opponent_levels = {"Om": None}
+        for level, (label, _) in COMPUTER_LEVELS.items():
+            self.opponent_levels[f"Calculator - {label}"] = level
+        current_opponent = next(label for label, level in self.opponent_levels.items()
+                                if level == (self.computer.level if self.computer else None))
+        self.opponent_var = tk.StringVar(value=current_opponent)
+        opponent_combo = ttk.Combobox(opponent_frame, textvariable=self.opponent_var,
+                                      values=list(self.opponent_levels), state='readonly', width=18)
+        opponent_combo.pack(side='left', padx=10)
+        
         buttons_frame = tk.Frame(settings_window, bg='#2c3e50')
         buttons_frame.pack(pady=30)
         
@@ -705,6 +2478,49 @@ class DiceGameGUI:
                                 padx=20, pady=5)
         cancel_button.pack(side='left', padx=10)
     
+    def apply_rules(self, fete):
+        variant = RULE_VARIANTS.get(self.game_mode, RULE_VARIANTS['standard'])
+        self.game_mode = variant.name
+        self.dice = Dice(fete=fete, numar_zaruri=variant.dice_count)
+        self.rules = variant.compile(self.dice.fete, self.target_score)
+        if self.computer:
+            self.computer.set_rules(self.rules, solve=False)
+            self.load_computer_policy()
+        
+        if self.shown_faces:
+            self.show_dice_text("🎲")
+    
+    def set_computer(self, level):
+        self.cancel_computer_move()
+        if level in COMPUTER_LEVELS:
+            if self.computer is None and self.player_names[1] not in COMPUTER_NAMES.values():
+                # the seat gets this name back when it is handed to a person again
+                self.human_player_name = self.player_names[1]
+            self.computer = ComputerPlayer(2, level, self.rules, solve=False)
+            self.set_player_names([self.player_names[0], self.computer.name])
+            self.load_computer_policy()
+        else:
+            if self.player_names[1] in COMPUTER_NAMES.values():
+                # otherwise the person's games would count for the computer's profile and rating
+                name = self.human_player_name
+                if name == self.player_names[0]:
+                    name = next(default for default in DEFAULT_PLAYER_NAMES if default != self.player_names[0])
+                self.set_player_names([self.player_names[0], name])
+            self.computer = None
+    
+    def load_computer_policy(self):
+        # solving takes up to a second for large dice and targets, so it runs on the worker
+        if self.computer is None or self.computer.policy is not None:
+            return
+        rules = self.rules
+        self.run_database_task(GamePolicy.for_rules, (rules,),
+                               callback=lambda policy: self.on_policy_ready(rules, policy))
+    
+    def on_policy_ready(self, rules, policy):
+        if self.computer is not None and self.computer.rules is rules:
+            self.computer.policy = policy
+            self.schedule_computer_move()
+    
     def save_settings(self, window):
         try:
             new_target = int(self.target_var.get())
@@ -718,8 +2534,18 @@ class DiceGameGUI:
                 messagebox.showerror("Eroare", "Zarul trebuie sa aiba cel putin 2 fete!")
                 return
             
+            new_names = [var.get().strip() for var in self.player_name_vars]
+            if not all(new_names) or new_names[0] == new_names[1]:
+                messagebox.showerror("Eroare", "Jucatorii trebuie sa aiba nume diferite!")
+                return
+            
             self.target_score = new_target
-            self.dice = Dice(fete=new_faces)
+            self.game_mode = self.variant_names[self.variant_var.get()]
+            self.apply_rules(new_faces)
+            self.set_player_names(new_names)
+            self.set_computer(self.opponent_levels[self.opponent_var.get()])
+            self.update_display()
+            self.save_checkpoint()
             
             window.destroy()
             messagebox.showinfo("Success", "Setarile au fost salvate!")
@@ -764,7 +2590,27 @@ class DiceGameGUI:
         scrollbar = ttk.Scrollbar(frame, orient='vertical', command=tree.yview)
         tree.configure(yscrollcommand=scrollbar.set)
         
-        games = self.database.get_game_history(50)
+        loading_label = tk.Label(history_window, text="Se incarca...", 
+                                 font=self.responsive.get_scaled_font('small'),
+                                 fg='#95a5a6', bg='#2c3e50')
+        loading_label.pack(before=frame)
+        
+        tree.pack(side='left', fill='both', expand=True)
+        scrollbar.pack(side='right', fill='y')
+        
+        close_button = tk.Button(history_window, text="INCHIDE", 
+                               command=history_window.destroy,
+                               font=self.responsive.get_scaled_font_bold('normal'),
+                               bg='#95a5a6', fg='white',
+                               padx=20, pady=5)
+        close_button.pack(pady=10)
+        
+        self.run_database_task(self.database.get_game_history, (50,),
+                               callback=lambda games: self.fill_game_history(tree, loading_label, games),
+                               window=history_window)
+    
+    def fill_game_history(self, tree, loading_label, games):
+        loading_label.destroy()
         for game in games:
             game_id, p1_score, p2_score, winner, rounds, duration, timestamp, mode = game
             
@@ -781,21 +2627,174 @@ class DiceGameGUI:
                 game_id, date_str, p1_score, p2_score, 
                 winner_text, rounds, duration_text
             ))
+    
+    def show_leaderboard(self):
+        leaderboard_window = tk.Toplevel(self.root)
+        leaderboard_window.title("Clasament")
+        leaderboard_window.geometry("500x500")
+        leaderboard_window.configure(bg='#2c3e50')
+        leaderboard_window.transient(self.root)
+        
+        title_label = tk.Label(leaderboard_window, text="CLASAMENT ELO", 
+                               font=self.responsive.get_scaled_font_bold('subtitle'),
+                               fg='#ecf0f1', bg='#2c3e50')
+        title_label.pack(pady=10)
+        
+        frame = tk.Frame(leaderboard_window, bg='#2c3e50')
+        frame.pack(fill='both', expand=True, padx=10, pady=10)
+        
+        columns = ('Loc', 'Jucator', 'Rating', 'Jocuri')
+        tree = ttk.Treeview(frame, columns=columns, show='headings', height=15)
+        
+        for column, width in zip(columns, (50, 200, 80, 70)):
+            tree.heading(column, text=column)
+            tree.column(column, width=width)
+        
+        scrollbar = ttk.Scrollbar(frame, orient='vertical', command=tree.yview)
+        tree.configure(yscrollcommand=scrollbar.set)
         
         tree.pack(side='left', fill='both', expand=True)
         scrollbar.pack(side='right', fill='y')
         
-        close_button = tk.Button(history_window, text="INCHIDE", 
-                               command=history_window.destroy,
+        ranks_label = tk.Label(leaderboard_window, text="Se incarca...", 
+                               font=self.responsive.get_scaled_font('small'),
+                               fg='#ecf0f1', bg='#2c3e50', justify='center')
+        ranks_label.pack()
+        
+        close_button = tk.Button(leaderboard_window, text="INCHIDE", 
+                               command=leaderboard_window.destroy,
                                font=self.responsive.get_scaled_font_bold('normal'),
                                bg='#95a5a6', fg='white',
                                padx=20, pady=5)
         close_button.pack(pady=10)
+        
+        self.run_database_task(self.load_leaderboard, (list(self.player_names),),
+                               callback=lambda data: self.fill_leaderboard(tree, ranks_label, data),
+                               window=leaderboard_window)
+    
+    def load_leaderboard(self, player_names):
+        leaderboard = self.database.get_leaderboard(50)
+        ranks = [(name, self.database.get_player_rank(player_id) if player_id else None)
+                 for name, player_id in zip(player_names, self.known_player_ids(player_names))]
+        return leaderboard, ranks
+    
+    def fill_leaderboard(self, tree, ranks_label, data):
+        leaderboard, ranks = data
+        for rank, player_id, name, rating, games in leaderboard:
+            tree.insert('', 'end', values=(rank, name, f"{rating:.0f}", games))
+        
+        ranks_label.config(text="\n".join(
+            f"{name}: locul {rank['rank']} ({rank['rating']:.0f})" if rank else f"{name}: fara rating"
+            for name, rank in ranks
+        ))
+    
+    def show_distribution_analysis(self):
+        analysis_window = tk.Toplevel(self.root)
+        analysis_window.title("Analiza Distributiei")
+        analysis_window.geometry("640x520")
+        analysis_window.configure(bg='#2c3e50')
+        analysis_window.transient(self.root)
+        
+        title_label = tk.Label(analysis_window, text="DISTRIBUTIA NUMARULUI DE RUNDE", 
+                               font=self.responsive.get_scaled_font_bold('subtitle'),
+                               fg='#ecf0f1', bg='#2c3e50')
+        title_label.pack(pady=10)
+        
+        canvas = tk.Canvas(analysis_window, width=600, height=260, bg='#34495e', highlightthickness=0)
+        canvas.pack(padx=10, pady=5)
+        canvas.create_text(300, 130, text="Se calculeaza...", fill='#95a5a6',
+                           font=self.responsive.get_scaled_font('normal'))
+        
+        summary_label = tk.Label(analysis_window, text="", 
+                                 font=self.responsive.get_scaled_font('small'),
+                                 fg='#ecf0f1', bg='#2c3e50', justify='left')
+        summary_label.pack(padx=10, pady=5, anchor='w')
+        
+        close_button = tk.Button(analysis_window, text="INCHIDE", 
+                               command=analysis_window.destroy,
+                               font=self.responsive.get_scaled_font_bold('normal'),
+                               bg='#95a5a6', fg='white',
+                               padx=20, pady=5)
+        close_button.pack(pady=10)
+        
+        strategy2 = ('computer', self.computer.level) if self.computer else 'optimal'
+        self.run_database_task(
+            self.load_distribution_analysis,
+            (self.game_mode, self.dice.fete, self.target_score, 'optimal', strategy2),
+            callback=lambda data: self.draw_distribution_analysis(canvas, summary_label, data),
+            window=analysis_window)
+    
+    def load_distribution_analysis(self, game_mode, fete, target_score, strategy1, strategy2):
+        import game_analysis
+        
+        distribution = game_analysis.analyze_game(game_mode, fete, target_score, strategy1, strategy2)
+        history = game_analysis.load_history(self.database, game_mode, fete, target_score)
+        comparison = game_analysis.compare_with_history(distribution, history)
+        seconds_per_move = self.database.get_trend_summary(days=90)['avg_decision_time']
+        throughput = (seconds_per_move, game_analysis.games_per_hour(distribution, seconds_per_move))
+        return distribution, history, comparison, throughput
+    
+    def draw_distribution_analysis(self, canvas, summary_label, data):
+        distribution, history, comparison, (seconds_per_move, games_per_hour) = data
+        canvas.delete('all')
+        
+        rounds = distribution['rounds']
+        shown = []
+        cumulative = 0.0
+        for round_count, probability in rounds.items():
+            shown.append(round_count)
+            cumulative += probability
+            if cumulative >= 0.995:
+                break
+        
+        observed = history['rounds']
+        observed_total = history['games']
+        # nothing to draw when, with these strategies, the game never finishes
+        peak = max([rounds[r] for r in shown] +
+                   [observed.get(r, 0) / observed_total for r in shown if observed_total], default=0)
+        
+        width, height, margin = 600, 260, 25
+        if not peak:
+            shown = []
+            canvas.create_text(width / 2, height / 2, fill='#ecf0f1', font=('Arial', 10),
+                               text="Cu aceste strategii jocul nu se termina")
+        bar_width = (width - 2 * margin) / max(len(shown), 1)
+        for index, round_count in enumerate(shown):
+            x0 = margin + index * bar_width
+            bar_height = (height - 2 * margin) * rounds[round_count] / peak
+            canvas.create_rectangle(x0 + 2, height - margin - bar_height, x0 + bar_width - 2, height - margin,
+                                    fill='#3498db', outline='')
+            if observed_total:
+                observed_height = (height - 2 * margin) * observed.get(round_count, 0) / observed_total / peak
+                y = height - margin - observed_height
+                canvas.create_line(x0 + 2, y, x0 + bar_width - 2, y, fill='#f39c12', width=3)
+            canvas.create_text(x0 + bar_width / 2, height - margin / 2, text=str(round_count),
+                               fill='#ecf0f1', font=('Arial', 8))
+        
+        canvas.create_text(margin, margin / 2, anchor='w', fill='#ecf0f1', font=('Arial', 8),
+                           text="albastru: calculat exact   portocaliu: jocuri salvate")
+        
+        reasons = distribution['end_reasons']
+        lines = [
+            f"Runde medii: {distribution['expected_rounds']:.2f}  |  "
+            f"Castiga J1: {distribution['winners'][1] * 100:.1f}%  J2: {distribution['winners'][2] * 100:.1f}%",
+            f"Scor exact: {reasons['exact'] * 100:.1f}%  |  Depasire: {reasons['bust'] * 100:.1f}%  |  "
+            f"Fata pierzatoare: {reasons['rolled_one'] * 100:.1f}%  |  Pasare: {reasons['pass'] * 100:.1f}%"
+        ]
+        if distribution['unfinished'] >= 0.001:
+            lines.append(f"Jocuri care nu se termina: {distribution['unfinished'] * 100:.1f}%")
+        if seconds_per_move:
+            lines.append(f"Jocuri pe ora estimate (la {seconds_per_move:.1f}s/mutare): {games_per_hour:.0f}")
+        if comparison:
+            chi = comparison['rounds_chi_square']
+            lines.append(f"Istoric: {comparison['games']} jocuri, runde medii {comparison['observed_mean_rounds']:.2f}, "
+                         f"p={chi['p_value']:.3f}")
+        summary_label.config(text="\n".join(lines))
     
     def show_performance_stats(self):
         stats_window = tk.Toplevel(self.root)
         stats_window.title("Statistici Performance")
-        stats_window.geometry("600x400")
+        stats_window.geometry("600x560")
         stats_window.configure(bg='#2c3e50')
         stats_window.transient(self.root)
         
@@ -840,8 +2839,45 @@ class DiceGameGUI:
                                        font=self.responsive.get_scaled_font_bold('normal'))
         historical_frame.pack(fill='both', expand=True)
         
-        player1_stats = self.database.get_player_stats(1)
-        player2_stats = self.database.get_player_stats(2)
+        loading_label = tk.Label(historical_frame, text="Se incarca...", 
+                                 font=self.responsive.get_scaled_font('small'),
+                                 fg='#95a5a6', bg='#34495e')
+        loading_label.pack(padx=10, pady=10)
+        
+        close_button = tk.Button(stats_window, text="INCHIDE", 
+                               command=stats_window.destroy,
+                               font=self.responsive.get_scaled_font_bold('normal'),
+                               bg='#95a5a6', fg='white',
+                               padx=20, pady=5)
+        close_button.pack(pady=10)
+        
+        player_names = list(self.player_names)
+        self.run_database_task(
+            self.load_historical_stats, (player_names,),
+            callback=lambda data: self.fill_historical_stats(historical_frame, loading_label,
+                                                             player_names, data),
+            window=stats_window)
+    
+    def load_historical_stats(self, player_names):
+        # seats without a profile fall back to every game played from that seat
+        profiles = [self.database.get_player_profile(player_id) if player_id else self.load_seat_stats(seat)
+                    for seat, player_id in enumerate(self.known_player_ids(player_names), start=1)]
+        return profiles, self.database.get_trend_summary(days=90)
+    
+    def load_seat_stats(self, seat):
+        games, wins, avg_score, avg_duration = self.database.get_player_stats(seat)
+        return {
+            'games': games,
+            'wins': wins or 0,
+            'win_rate': wins / games * 100 if games else 0,
+            'avg_score': avg_score or 0,
+            'avg_duration': avg_duration,
+            'avg_decision_time': None
+        }
+    
+    def fill_historical_stats(self, historical_frame, loading_label, player_names, data):
+        (player1_stats, player2_stats), trend = data
+        loading_label.destroy()
         
         stats_frame = tk.Frame(historical_frame, bg='#34495e')
         stats_frame.pack(fill='both', expand=True, padx=10, pady=10)
@@ -849,21 +2885,12 @@ class DiceGameGUI:
         left_frame = tk.Frame(stats_frame, bg='#34495e')
         left_frame.pack(side='left', fill='both', expand=True)
         
-        tk.Label(left_frame, text="JUCATOR 1", 
+        tk.Label(left_frame, text=player_names[0].upper(), 
                 font=self.responsive.get_scaled_font_bold('normal'),
                 fg='#27ae60', bg='#34495e').pack()
         
-        if player1_stats and player1_stats[0] > 0:
-            total_games, wins, avg_score, avg_duration = player1_stats
-            win_rate = (wins / total_games * 100) if total_games > 0 else 0
-            
-            p1_stats_text = [
-                f"Jocuri totale: {total_games}",
-                f"Victorii: {wins}",
-                f"Rata victorii: {win_rate:.1f}%",
-                f"Scor mediu: {avg_score:.1f}" if avg_score else "Scor mediu: N/A",
-                f"Durata medie: {avg_duration:.1f}s" if avg_duration else "Durata medie: N/A"
-            ]
+        if player1_stats and player1_stats['games'] > 0:
+            p1_stats_text = self.format_player_profile(player1_stats)
             
             for stat in p1_stats_text:
                 tk.Label(left_frame, text=stat, 
@@ -877,21 +2904,12 @@ class DiceGameGUI:
         right_frame = tk.Frame(stats_frame, bg='#34495e')
         right_frame.pack(side='right', fill='both', expand=True)
         
-        tk.Label(right_frame, text="JUCATOR 2", 
+        tk.Label(right_frame, text=player_names[1].upper(), 
                 font=self.responsive.get_scaled_font_bold('normal'),
                 fg='#3498db', bg='#34495e').pack()
         
-        if player2_stats and player2_stats[0] > 0:
-            total_games, wins, avg_score, avg_duration = player2_stats
-            win_rate = (wins / total_games * 100) if total_games > 0 else 0
-            
-            p2_stats_text = [
-                f"Jocuri totale: {total_games}",
-                f"Victorii: {wins}",
-                f"Rata victorii: {win_rate:.1f}%",
-                f"Scor mediu: {avg_score:.1f}" if avg_score else "Scor mediu: N/A",
-                f"Durata medie: {avg_duration:.1f}s" if avg_duration else "Durata medie: N/A"
-            ]
+        if player2_stats and player2_stats['games'] > 0:
+            p2_stats_text = self.format_player_profile(player2_stats)
             
             for stat in p2_stats_text:
                 tk.Label(right_frame, text=stat, 
@@ -902,12 +2920,46 @@ class DiceGameGUI:
                     font=self.responsive.get_scaled_font('small'),
                     fg='#95a5a6', bg='#34495e').pack()
         
-        close_button = tk.Button(stats_window, text="INCHIDE", 
-                               command=stats_window.destroy,
-                               font=self.responsive.get_scaled_font_bold('normal'),
-                               bg='#95a5a6', fg='white',
-                               padx=20, pady=5)
-        close_button.pack(pady=10)
+        trends_frame = tk.Frame(historical_frame, bg='#34495e')
+        trends_frame.pack(fill='x', padx=10, pady=(0, 10))
+        
+        tk.Label(trends_frame, text="TENDINTE - ULTIMELE 90 ZILE", 
+                font=self.responsive.get_scaled_font_bold('normal'),
+                fg='#f39c12', bg='#34495e').pack()
+        
+        if trend['games'] > 0:
+            percentiles = trend['decision_time_percentiles']
+            percentile_text = " / ".join(
+                f"{percentiles[p]:.1f}s" if percentiles[p] is not None else "N/A" for p in (50, 90, 99)
+            )
+            
+            trend_text = [
+                f"Jocuri: {trend['games']}  (J1: {trend['player1_wins']}, J2: {trend['player2_wins']}, "
+                f"Egal: {trend['draws']})",
+                f"Runde medii: {trend['avg_rounds']:.1f}  |  Durata medie: {trend['avg_duration']:.1f}s",
+                f"Depasiri: {trend['bust_rate']:.1f}%  |  Pierderi cu 1: {trend['one_loss_rate']:.1f}%",
+                f"Timp decizie p50 / p90 / p99: {percentile_text}"
+            ]
+            
+            for stat in trend_text:
+                tk.Label(trends_frame, text=stat, 
+                        font=self.responsive.get_scaled_font('small'),
+                        fg='#ecf0f1', bg='#34495e').pack(anchor='w')
+        else:
+            tk.Label(trends_frame, text="Nu exista date", 
+                    font=self.responsive.get_scaled_font('small'),
+                    fg='#95a5a6', bg='#34495e').pack()
+    
+    def format_player_profile(self, profile):
+        return [
+            f"Jocuri totale: {profile['games']}",
+            f"Victorii: {profile['wins']}",
+            f"Rata victorii: {profile['win_rate']:.1f}%",
+            f"Scor mediu: {profile['avg_score']:.1f}",
+            f"Durata medie: {profile['avg_duration']:.1f}s" if profile['avg_duration'] else "Durata medie: N/A",
+            f"Timp mediu decizie: {profile['avg_decision_time']:.2f}s" if profile['avg_decision_time'] is not None
+            else "Timp mediu decizie: N/A"
+        ]
     
     def show_rules(self):
         rules_window = tk.Toplevel(self.root)
@@ -942,6 +2994,8 @@ PERFORMANCE:
 - Timpul de decizie este masurat
 - Rata de succes este calculata
 - Factorul de risc este monitorizat
+"""
+        rules_text += f"\nVARIANTA CURENTA: {self.rules.variant.label}\n{self.rules.variant.description}\n"
         
         text_frame = tk.Frame(rules_window, bg='#2c3e50')
         text_frame.pack(fill='both', expand=True, padx=20, pady=10)
@@ -972,6 +3026,11 @@ PERFORMANCE:
                                fg='#ecf0f1', bg='#2c3e50')
         title_label.pack(pady=20)
         
+        info_text = """Advanced Edition with Analytics
+
+Un joc de noroc cu zaruri pentru doi jucatori.
+Istoric, statistici si metrici de performanta
+salvate in baza de date SQLite."""
         
         info_label = tk.Label(about_window, text=info_text, 
                              font=self.responsive.get_scaled_font('small'),
@@ -0,0 +1,501 @@
+import argparse
+import heapq
+import itertools
+import multiprocessing
+import os
+import queue
+import random
+import sqlite3
+import sys
+import threading
+import time
+import tracemalloc
+
+from joc_zaruri import COMPUTER_LEVELS, RULE_VARIANTS, ComputerPlayer, Dice, GameDatabase, compile_rules
+
+THINK_TIME_MODES = ('recorded', 'exponential', 'fixed', 'none')
+DEFAULT_THINK_TIME = 2.0
+RECORDED_SAMPLE_SIZE = 10000
+LOCK_RETRIES = 20
+# far below the game's 5 s default, so waiting on a lock surfaces here and can be timed
+LOCK_TIMEOUT = 0.05
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+
+def current_rss_bytes():
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        import resource
+        # ru_maxrss is the peak, in KiB on Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class ThinkTimeSampler:
+    def __init__(self, mode='recorded', mean=DEFAULT_THINK_TIME, speed=1.0, db_path=None, rng=None):
+        if mode not in THINK_TIME_MODES:
+            raise ValueError(f"Mod necunoscut pentru timpul de gandire: {mode}")
+        self.mode = mode
+        self.mean = mean
+        self.speed = max(speed, 1e-9)
+        self.rng = rng or random.Random()
+        self.samples = []
+        if mode == 'recorded':
+            self.samples = self.load_recorded(db_path) if db_path else []
+            if not self.samples:
+                self.mode = 'exponential'
+
+    def load_recorded(self, db_path):
+        conn = sqlite3.connect(db_path)
+        cursor = conn.cursor()
+        try:
+            cursor.execute('''
+                SELECT decision_time FROM player_moves
+                WHERE decision_time > 0
+                ORDER BY RANDOM()
+                LIMIT ?
+            ''', (RECORDED_SAMPLE_SIZE,))
+            samples = [row[0] for row in cursor.fetchall()]
+        except sqlite3.OperationalError:
+            samples = []
+        conn.close()
+        return samples
+
+    def sample(self):
+        if self.mode == 'none':
+            return 0.0
+        if self.mode == 'fixed':
+            value = self.mean
+        elif self.mode == 'recorded':
+            value = self.rng.choice(self.samples)
+        else:
+            value = self.rng.expovariate(1 / self.mean)
+        return value / self.speed
+
+
+class SimulatedTable:
+    # headless copy of the roll_dice/pass_turn flow, driven by the compiled rules
+    def __init__(self, table_id, rules, levels, player_names, think_time):
+        self.table_id = table_id
+        self.rules = rules
+        self.dice = Dice(fete=rules.fete, numar_zaruri=rules.dice_count)
+        self.players = [ComputerPlayer(seat, level, rules) for seat, level in enumerate(levels, start=1)]
+        self.player_names = player_names
+        self.think_time = think_time
+        self.games_played = 0
+        self.reset()
+
+    def reset(self):
+        self.scores = [0, 0]
+        self.current_player = 1
+        self.round_count = 0
+        self.moves = []
+        self.started = time.perf_counter()
+
+    def play_move(self, decision_time):
+        seat = self.current_player
+        other = 2 if seat == 1 else 1
+        score = self.scores[seat - 1]
+        opponent_score = self.scores[other - 1]
+        opponent_passed = bool(self.moves) and self.moves[-1][1] == "pass"
+        action = self.players[seat - 1].choose_action(score, opponent_score, opponent_passed)
+
+        if action == "roll":
+            result = self.dice.roll()
+            faces = result if isinstance(result, list) else [result]
+            if self.rules.fatal_face(faces) is not None:
+                self.moves.append((seat, "roll", sum(faces), score, score, decision_time))
+                return self.finish(other, 'rolled_one')
+
+            new_score, outcome = self.rules.apply(score, self.rules.points(faces))
+            self.scores[seat - 1] = new_score
+            self.moves.append((seat, "roll", sum(faces), score, new_score, decision_time))
+            if outcome == 'exact':
+                return self.finish(seat, 'exact')
+            if outcome == 'bust':
+                return self.finish(other, 'bust')
+        else:
+            self.moves.append((seat, "pass", 0, score, score, decision_time))
+            if self.rules.pass_ends_game(score, opponent_score, opponent_passed):
+                if self.scores[0] == self.scores[1]:
+                    return self.finish(0, 'pass')
+                return self.finish(1 if self.scores[0] > self.scores[1] else 2, 'pass')
+
+        self.round_count += 1
+        self.current_player = other
+        return None
+
+    def finish(self, winner, end_reason):
+        game = {
+            'scores': tuple(self.scores),
+            'winner': winner,
+            'rounds': self.round_count,
+            'duration': time.perf_counter() - self.started,
+            'moves': self.moves,
+            'end_reason': end_reason,
+            'game_mode': self.rules.name,
+            'dice_faces': self.rules.fete,
+            'target_score': self.rules.target_score,
+            'player_names': self.player_names
+        }
+        self.games_played += 1
+        self.reset()
+        return game
+
+
+class LoadStats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started = time.perf_counter()
+        self.total_games = 0
+        self.total_moves = 0
+        self.total_lock_errors = 0
+        self.total_lock_wait = 0.0
+        self.total_errors = 0
+        self.failed_writers = 0
+        self.reset_interval()
+
+    def reset_interval(self):
+        self.interval_started = time.perf_counter()
+        self.games = 0
+        self.moves = 0
+        self.lock_errors = 0
+        self.lock_wait = 0.0
+        self.errors = 0
+        self.save_latencies = []
+        self.read_latencies = []
+
+    def record_save(self, latency, moves):
+        with self.lock:
+            self.games += 1
+            self.moves += moves
+            self.total_games += 1
+            self.total_moves += moves
+            self.save_latencies.append(latency)
+
+    def record_read(self, latency):
+        with self.lock:
+            self.read_latencies.append(latency)
+
+    def record_lock_error(self, wait):
+        with self.lock:
+            self.lock_errors += 1
+            self.total_lock_errors += 1
+            self.lock_wait += wait
+            self.total_lock_wait += wait
+
+    def record_error(self):
+        with self.lock:
+            self.errors += 1
+            self.total_errors += 1
+
+    def record_writer_failure(self):
+        with self.lock:
+            self.failed_writers += 1
+
+    def snapshot(self, pending_saves):
+        with self.lock:
+            elapsed = time.perf_counter() - self.interval_started
+            saves = sorted(self.save_latencies)
+            reads = sorted(self.read_latencies)
+            report = {
+                'elapsed': time.perf_counter() - self.started,
+                'games_per_second': self.games / elapsed if elapsed else 0.0,
+                'moves_per_second': self.moves / elapsed if elapsed else 0.0,
+                'save_p50': percentile(saves, 0.50),
+                'save_p95': percentile(saves, 0.95),
+                'save_p99': percentile(saves, 0.99),
+                'save_max': saves[-1] if saves else 0.0,
+                'read_p50': percentile(reads, 0.50),
+                'read_p99': percentile(reads, 0.99),
+                'reads': len(reads),
+                'lock_errors': self.lock_errors,
+                'lock_wait': self.lock_wait,
+                'errors': self.errors,
+                'total_games': self.total_games,
+                'total_moves': self.total_moves,
+                'total_lock_errors': self.total_lock_errors,
+                'total_errors': self.total_errors,
+                'total_lock_wait': self.total_lock_wait,
+                'failed_writers': self.failed_writers,
+                'pending_saves': pending_saves,
+                'rss_bytes': current_rss_bytes()
+            }
+            if tracemalloc.is_tracing():
+                report['traced_bytes'], report['traced_peak_bytes'] = tracemalloc.get_traced_memory()
+            self.reset_interval()
+            return report
+
+
+def with_lock_retry(function, stats, *args, **kwargs):
+    # lock wait is the busy timeout spent inside the failed call plus the backoff after it
+    for attempt in range(LOCK_RETRIES):
+        started = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        except sqlite3.OperationalError as exc:
+            if 'locked' not in str(exc) and 'busy' not in str(exc):
+                raise
+            time.sleep(random.uniform(0, min(0.01 * (2 ** attempt), 0.25)))
+            stats.record_lock_error(time.perf_counter() - started)
+    return function(*args, **kwargs)
+
+
+class StatsForwarder:
+    # stands in for LoadStats inside writer processes; the parent drains the queue into the real one
+    def __init__(self, results):
+        self.results = results
+
+    def record_save(self, latency, moves):
+        self.results.put(('save', latency, moves))
+
+    def record_lock_error(self, wait):
+        self.results.put(('lock', wait))
+
+    def record_error(self):
+        self.results.put(('error',))
+
+    def record_writer_failure(self):
+        self.results.put(('writer_failed',))
+
+
+def drain_results(results, stats):
+    while True:
+        try:
+            result = results.get_nowait()
+        except queue.Empty:
+            return
+        if result[0] == 'save':
+            stats.record_save(result[1], result[2])
+        elif result[0] == 'lock':
+            stats.record_lock_error(result[1])
+        elif result[0] == 'writer_failed':
+            stats.record_writer_failure()
+        else:
+            stats.record_error()
+
+
+def writer_loop(db_path, shards, shard_key, jobs, stats, busy_timeout=LOCK_TIMEOUT):
+    # opening runs init_database, which takes write locks like any save
+    try:
+        database = with_lock_retry(GameDatabase, stats, db_path, shards=shards, busy_timeout=busy_timeout)
+    except sqlite3.Error:
+        stats.record_writer_failure()
+        database = None
+    player_ids = {}
+    while True:
+        game = jobs.get()
+        if game is None:
+            break
+        if database is None:
+            # still drained, so the tables feeding this writer do not block on a full queue
+            stats.record_error()
+            continue
+
+        started = time.perf_counter()
+        try:
+            names = game['player_names']
+            if not all(name in player_ids for name in names):
+                player_ids.update(zip(names, with_lock_retry(database.get_player_ids, stats, names)))
+            score1, score2 = game['scores']
+            with_lock_retry(database.save_game, stats, score1, score2, game['winner'], game['rounds'],
+                            game['duration'], moves=game['moves'], end_reason=game['end_reason'],
+                            game_mode=game['game_mode'], player_ids=[player_ids[name] for name in names],
+                            shard_key=shard_key, dice_faces=game['dice_faces'],
+                            target_score=game['target_score'])
+            stats.record_save(time.perf_counter() - started, len(game['moves']))
+        except sqlite3.Error:
+            stats.record_error()
+
+
+def writer_process(db_path, shards, shard_key, jobs, results, busy_timeout=LOCK_TIMEOUT):
+    writer_loop(db_path, shards, shard_key, jobs, StatsForwarder(results), busy_timeout)
+
+
+def pending_jobs(job_queues):
+    try:
+        return sum(jobs.qsize() for jobs in job_queues)
+    except NotImplementedError:
+        return -1
+
+
+def reader_loop(db_path, shards, stop, stats, player_names, interval, rng, busy_timeout=LOCK_TIMEOUT):
+    try:
+        database = with_lock_retry(GameDatabase, stats, db_path, shards=shards, busy_timeout=busy_timeout)
+    except sqlite3.Error:
+        stats.record_error()
+        return
+    queries = (
+        lambda: database.get_game_history(50),
+        lambda: database.get_leaderboard(50),
+        lambda: database.get_trend_summary(days=90),
+        lambda: database.find_player(rng.choice(player_names))
+    )
+    while not stop.wait(interval):
+        started = time.perf_counter()
+        try:
+            with_lock_retry(rng.choice(queries), stats)
+            stats.record_read(time.perf_counter() - started)
+        except sqlite3.Error:
+            stats.record_error()
+
+
+def run_load(db_path, players=1000, duration=60.0, writers=4, readers=0, read_interval=1.0,
+             shards=1, writer_processes=False, busy_timeout=LOCK_TIMEOUT,
+             game_mode='standard', fete=6, target_score=21, levels=('mediu', 'greu'),
+             think_mode='recorded', think_mean=DEFAULT_THINK_TIME, speed=1.0, think_db=None,
+             report_interval=10.0, trace_memory=False, seed=None):
+    rng = random.Random(seed)
+    if seed is not None:
+        random.seed(seed)
+    if trace_memory:
+        tracemalloc.start()
+
+    database = GameDatabase(db_path, shards=shards)
+    shards = len(database.shards)
+    rules = compile_rules(game_mode, fete, target_score)
+    think_time = ThinkTimeSampler(think_mode, think_mean, speed, think_db or db_path, rng)
+
+    tables = []
+    for table_id in range(max(1, players // 2)):
+        names = [f"load-{table_id * 2}", f"load-{table_id * 2 + 1}"]
+        tables.append(SimulatedTable(table_id, rules, [rng.choice(levels), rng.choice(levels)], names, think_time))
+    player_names = [name for table in tables for name in table.player_names]
+
+    stats = LoadStats()
+    stop = threading.Event()
+    # each writer owns a slice of the tables and, with enough shards, a database file of its own
+    if writer_processes:
+        context = multiprocessing.get_context()
+        job_queues = [context.Queue(maxsize=100) for _ in range(writers)]
+        results = context.Queue()
+        workers = [context.Process(target=writer_process, args=(db_path, shards, i, job_queues[i], results, busy_timeout),
+                                   name=f"load-writer-{i}", daemon=True) for i in range(writers)]
+    else:
+        job_queues = [queue.Queue(maxsize=100) for _ in range(writers)]
+        results = None
+        workers = [threading.Thread(target=writer_loop, args=(db_path, shards, i, job_queues[i], stats, busy_timeout),
+                                    name=f"load-writer-{i}", daemon=True) for i in range(writers)]
+    workers += [threading.Thread(target=reader_loop,
+                                 args=(db_path, shards, stop, stats, player_names, read_interval,
+                                       random.Random(rng.random()), busy_timeout),
+                                 name=f"load-reader-{i}", daemon=True) for i in range(readers)]
+    for worker in workers:
+        worker.start()
+
+    started = time.perf_counter()
+    deadline = started + duration
+    next_report = started + report_interval
+    # the sequence number breaks ties, so with no think time the tables take turns instead of table 0 winning
+    sequence = itertools.count()
+    events = [(started + think_time.sample() * rng.random(), next(sequence), table.table_id) for table in tables]
+    heapq.heapify(events)
+
+    try:
+        while True:
+            now = time.perf_counter()
+            if results is not None:
+                drain_results(results, stats)
+            if now >= next_report:
+                yield stats.snapshot(pending_jobs(job_queues))
+                next_report += report_interval
+            if now >= deadline:
+                break
+
+            due, _, table_id = events[0]
+            if due > now:
+                time.sleep(min(due - now, next_report - now, deadline - now))
+                continue
+
+            heapq.heappop(events)
+            decision_time = think_time.sample() * think_time.speed
+            game = tables[table_id].play_move(decision_time)
+            if game is not None:
+                # a full queue blocks here, which is the backpressure a slow database puts on the tables
+                job_queues[table_id % writers].put(game)
+            heapq.heappush(events, (max(due, now) + think_time.sample(), next(sequence), table_id))
+    finally:
+        stop.set()
+        for jobs in job_queues:
+            jobs.put(None)
+        for worker in workers:
+            worker.join()
+        if results is not None:
+            drain_results(results, stats)
+        database.sync_ratings()
+
+        final = stats.snapshot(pending_jobs(job_queues))
+        final['final'] = True
+        yield final
+        if trace_memory:
+            tracemalloc.stop()
+
+
+def format_report(report):
+    line = (f"[{report['elapsed']:8.1f}s] {report['games_per_second']:7.1f} jocuri/s "
+            f"{report['moves_per_second']:8.1f} mutari/s | salvare p50={report['save_p50'] * 1000:.1f}ms "
+            f"p95={report['save_p95'] * 1000:.1f}ms p99={report['save_p99'] * 1000:.1f}ms "
+            f"max={report['save_max'] * 1000:.1f}ms | blocari={report['lock_errors']} "
+            f"asteptare={report['lock_wait'] * 1000:.0f}ms erori={report['errors']} "
+            f"coada={report['pending_saves']} | RSS={report['rss_bytes'] / 2 ** 20:.1f}MiB")
+    if report['failed_writers']:
+        line += f" | scriitori opriti={report['failed_writers']}"
+    if report['reads']:
+        line += f" | citire p50={report['read_p50'] * 1000:.1f}ms p99={report['read_p99'] * 1000:.1f}ms"
+    if 'traced_bytes' in report:
+        line += f" | heap={report['traced_bytes'] / 2 ** 20:.1f}MiB"
+    if report.get('final'):
+        line += (f"\nTotal: {report['total_games']} jocuri, {report['total_moves']} mutari, "
+                 f"{report['total_lock_errors']} blocari, {report['total_lock_wait']:.2f}s asteptare la blocari, "
+                 f"{report['total_errors']} erori")
+    return line
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generator de incarcare si test de anduranta")
+    parser.add_argument('--db', default="load_test.db")
+    parser.add_argument('--players', type=int, default=1000)
+    parser.add_argument('--duration', type=float, default=60.0, help="secunde (ore pentru soak: 3600*N)")
+    parser.add_argument('--writers', type=int, default=4)
+    parser.add_argument('--readers', type=int, default=0)
+    parser.add_argument('--shards', type=int, default=1, help="fisiere SQLite peste care se impart jocurile")
+    parser.add_argument('--writer-processes', action='store_true', help="scriitori in procese separate")
+    parser.add_argument('--busy-timeout', type=float, default=LOCK_TIMEOUT,
+                        help="secunde de asteptare SQLite inainte ca o blocare sa fie numarata")
+    parser.add_argument('--read-interval', type=float, default=1.0)
+    parser.add_argument('--mode', choices=RULE_VARIANTS, default='standard')
+    parser.add_argument('--fete', type=int, default=6)
+    parser.add_argument('--target', type=int, default=21)
+    parser.add_argument('--levels', default="mediu,greu",
+                        help="niveluri pentru jucatorii simulati, din: " + ", ".join(COMPUTER_LEVELS))
+    parser.add_argument('--think-time', choices=THINK_TIME_MODES, default='recorded')
+    parser.add_argument('--think-mean', type=float, default=DEFAULT_THINK_TIME)
+    parser.add_argument('--think-db', help="baza de date din care se iau timpii de decizie inregistrati")
+    parser.add_argument('--speed', type=float, default=1.0, help="factor de accelerare a timpului de gandire")
+    parser.add_argument('--report-interval', type=float, default=10.0)
+    parser.add_argument('--trace-memory', action='store_true')
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args(argv)
+
+    levels = tuple(level for level in args.levels.split(',') if level in COMPUTER_LEVELS) or ('greu',)
+    for report in run_load(args.db, players=args.players, duration=args.duration, writers=args.writers,
+                           readers=args.readers, read_interval=args.read_interval, shards=args.shards,
+                           writer_processes=args.writer_processes, busy_timeout=args.busy_timeout,
+                           game_mode=args.mode,
+                           fete=args.fete, target_score=args.target, levels=levels,
+                           think_mode=args.think_time, think_mean=args.think_mean, speed=args.speed,
+                           think_db=args.think_db, report_interval=args.report_interval,
+                           trace_memory=args.trace_memory, seed=args.seed):
+        print(format_report(report), flush=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,236 @@
+import mmap
+import os
+import sqlite3
+import struct
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+MAGIC = b'DICEMOVE'
+VERSION = 1
+
+HEADER_FORMAT = '<8sHHI'
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+
+# game_id, player, action, dice_result, pad, score_before, score_after, decision_time (ms)
+RECORD_FORMAT = '<IBBBxHHI'
+RECORD_SIZE = struct.calcsize(RECORD_FORMAT)
+
+DEFAULT_BLOCK_RECORDS = 4096
+
+ACTION_CODES = {'roll': 0, 'pass': 1}
+ACTION_NAMES = {code: name for name, code in ACTION_CODES.items()}
+
+TIME_SCALE = 1000
+MAX_SCORE = 0xFFFF
+MAX_DECISION_TIME = 0xFFFFFFFF
+
+if np is not None:
+    MOVE_DTYPE = np.dtype({
+        'names': ['game_id', 'player', 'action', 'dice_result',
+                  'score_before', 'score_after', 'decision_time_ms'],
+        'formats': ['<u4', 'u1', 'u1', 'u1', '<u2', '<u2', '<u4'],
+        'offsets': [0, 4, 5, 6, 8, 10, 12],
+        'itemsize': RECORD_SIZE
+    })
+else:
+    MOVE_DTYPE = None
+
+
+class MoveLogError(Exception):
+    pass
+
+
+def encode_move(game_id, player, action, dice_result, score_before, score_after, decision_time):
+    if isinstance(dice_result, list):
+        dice_result = sum(dice_result)
+    action_code = ACTION_CODES.get(action, action)
+    decision_ms = int(round((decision_time or 0) * TIME_SCALE))
+    return struct.pack(
+        RECORD_FORMAT,
+        game_id or 0,
+        player,
+        action_code,
+        min(dice_result or 0, 0xFF),
+        min(max(score_before, 0), MAX_SCORE),
+        min(max(score_after, 0), MAX_SCORE),
+        min(max(decision_ms, 0), MAX_DECISION_TIME)
+    )
+
+
+def decode_move(record):
+    game_id, player, action_code, dice_result, score_before, score_after, decision_ms = record
+    return (game_id, player, ACTION_NAMES.get(action_code, str(action_code)), dice_result,
+            score_before, score_after, decision_ms / TIME_SCALE)
+
+
+class MoveLogWriter:
+    def __init__(self, path, block_records=DEFAULT_BLOCK_RECORDS, sync=False):
+        self.path = path
+        self.block_records = max(1, block_records)
+        self.sync = sync
+        self.buffer = bytearray()
+        self.pending = 0
+        self.records_written = 0
+
+        new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+        self.file = open(path, 'ab')
+        if new_file:
+            self.file.write(struct.pack(HEADER_FORMAT, MAGIC, VERSION, RECORD_SIZE, 0))
+            self.file.flush()
+        else:
+            _check_header(path)
+            self._drop_partial_record()
+
+    def _drop_partial_record(self):
+        size = os.path.getsize(self.path)
+        extra = (size - HEADER_SIZE) % RECORD_SIZE
+        if extra:
+            self.file.truncate(size - extra)
+
+    def append(self, game_id, player, action, dice_result, score_before, score_after, decision_time):
+        self.buffer += encode_move(game_id, player, action, dice_result,
+                                   score_before, score_after, decision_time)
+        self.pending += 1
+        if self.pending >= self.block_records:
+            self.flush()
+
+    def extend(self, moves):
+        for move in moves:
+            self.append(*move)
+
+    def flush(self):
+        if not self.pending:
+            return
+        self.file.write(self.buffer)
+        self.file.flush()
+        if self.sync:
+            os.fsync(self.file.fileno())
+        self.records_written += self.pending
+        self.buffer = bytearray()
+        self.pending = 0
+
+    def close(self):
+        if self.file.closed:
+            return
+        self.flush()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def _check_header(path):
+    with open(path, 'rb') as f:
+        header = f.read(HEADER_SIZE)
+    if len(header) < HEADER_SIZE:
+        raise MoveLogError(f"{path}: fisier prea scurt pentru un jurnal de mutari")
+    magic, version, record_size, _ = struct.unpack(HEADER_FORMAT, header)
+    if magic != MAGIC:
+        raise MoveLogError(f"{path}: nu este un jurnal de mutari")
+    if version != VERSION or record_size != RECORD_SIZE:
+        raise MoveLogError(f"{path}: versiune necunoscuta {version} (record {record_size} bytes)")
+
+
+class MoveLogReader:
+    def __init__(self, path):
+        self.path = path
+        _check_header(path)
+        self.file = open(path, 'rb')
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.count = (len(self.map) - HEADER_SIZE) // RECORD_SIZE
+        self.view = memoryview(self.map)[HEADER_SIZE:HEADER_SIZE + self.count * RECORD_SIZE]
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError(index)
+        return decode_move(struct.unpack_from(RECORD_FORMAT, self.view, index * RECORD_SIZE))
+
+    def __iter__(self):
+        for record in struct.iter_unpack(RECORD_FORMAT, self.view):
+            yield decode_move(record)
+
+    def as_array(self):
+        if np is None:
+            raise MoveLogError("numpy nu este instalat")
+        return np.frombuffer(self.map, dtype=MOVE_DTYPE, count=self.count, offset=HEADER_SIZE)
+
+    def close(self):
+        self.view.release()
+        try:
+            self.map.close()
+        except BufferError:
+            # arrays from as_array() still point into the map; it is released with them
+            pass
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def export_moves(db_path, log_path, game_id=None, batch_size=DEFAULT_BLOCK_RECORDS):
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+
+    query = '''
+        SELECT game_id, player, action, dice_result, score_before, score_after, decision_time
+        FROM player_moves
+    '''
+    params = ()
+    if game_id is not None:
+        query += ' WHERE game_id = ?'
+        params = (game_id,)
+    query += ' ORDER BY id'
+    cursor.execute(query, params)
+
+    with MoveLogWriter(log_path, block_records=batch_size) as writer:
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            writer.extend(rows)
+
+    conn.close()
+    return writer.records_written
+
+
+def import_moves(log_path, db_path, batch_size=DEFAULT_BLOCK_RECORDS):
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    imported = 0
+
+    with MoveLogReader(log_path) as reader:
+        batch = []
+        for move in reader:
+            batch.append(move)
+            if len(batch) >= batch_size:
+                imported += _insert_moves(cursor, batch)
+                batch = []
+        if batch:
+            imported += _insert_moves(cursor, batch)
+
+    conn.commit()
+    conn.close()
+    return imported
+
+
+def _insert_moves(cursor, moves):
+    cursor.executemany('''
+        INSERT INTO player_moves
+        (game_id, player, action, dice_result, score_before, score_after, decision_time)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    ''', moves)
+    return len(moves)
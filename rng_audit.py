@@ -0,0 +1,408 @@
+import argparse
+import math
+import os
+import random
+import sqlite3
+import sys
+import time
+from multiprocessing import Pool
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from joc_zaruri import Dice, RULE_VARIANTS
+
+BACKENDS = ('dice', 'random', 'numpy')
+PERIOD_FORMATS = {
+    'day': '%Y-%m-%d',
+    'week': '%Y-W%W',
+    'month': '%Y-%m',
+    'all': 'total'
+}
+
+DEFAULT_CHUNK_SIZE = 1000000
+GAP_LIMIT = 20
+SIGNIFICANCE = 0.001
+
+
+def gammaincc(a, x):
+    # regularized upper incomplete gamma Q(a, x)
+    if x <= 0:
+        return 1.0
+    if x < a + 1:
+        term = total = 1.0 / a
+        n = a
+        for _ in range(1000):
+            n += 1
+            term *= x / n
+            total += term
+            if abs(term) < abs(total) * 1e-15:
+                break
+        return max(0.0, 1.0 - total * math.exp(-x + a * math.log(x) - math.lgamma(a)))
+
+    tiny = 1e-300
+    b = x + 1 - a
+    c = 1 / tiny
+    d = 1 / b
+    h = d
+    for i in range(1, 1000):
+        an = -i * (i - a)
+        b += 2
+        d = an * d + b
+        d = tiny if abs(d) < tiny else d
+        c = b + an / c
+        c = tiny if abs(c) < tiny else c
+        d = 1 / d
+        delta = d * c
+        h *= delta
+        if abs(delta - 1) < 1e-15:
+            break
+    return math.exp(-x + a * math.log(x) - math.lgamma(a)) * h
+
+
+def chi_square(observed, expected):
+    statistic = sum((o - e) ** 2 / e for o, e in zip(observed, expected) if e > 0)
+    df = sum(1 for e in expected if e > 0) - 1
+    p_value = gammaincc(df / 2, statistic / 2) if df > 0 else 1.0
+    return statistic, df, p_value
+
+
+def normal_p_value(z):
+    return math.erfc(abs(z) / math.sqrt(2))
+
+
+def draw_chunk(backend, fete, size, seed, index):
+    if backend == 'numpy':
+        if np is None:
+            raise RuntimeError("numpy nu este instalat")
+        return np.random.default_rng([seed, index]).integers(1, fete + 1, size=size)
+
+    chunk_seed = (seed << 32) ^ index
+    if backend == 'random':
+        rng = random.Random(chunk_seed)
+        return rng.choices(range(1, fete + 1), k=size)
+
+    random.seed(chunk_seed)
+    dice = Dice(fete=fete)
+    return [dice.roll() for _ in range(size)]
+
+
+def summarize_chunk(values, fete, gap_face):
+    if np is not None:
+        return _summarize_numpy(np.asarray(values, dtype=np.int64), fete, gap_face)
+    return _summarize_python(values, fete, gap_face)
+
+
+def _summarize_numpy(values, fete, gap_face):
+    n = len(values)
+    counts = np.bincount(values, minlength=fete + 1)[1:fete + 1]
+    high = 2 * values > fete
+
+    positions = np.flatnonzero(values == gap_face)
+    gaps = [0] * (GAP_LIMIT + 1)
+    if len(positions) > 1:
+        gap_lengths = np.minimum(np.diff(positions) - 1, GAP_LIMIT)
+        gaps = np.bincount(gap_lengths, minlength=GAP_LIMIT + 1).tolist()
+
+    floats = values.astype(np.float64)
+    return {
+        'n': n,
+        'counts': counts.tolist(),
+        'first': int(values[0]),
+        'last': int(values[-1]),
+        'n_high': int(high.sum()),
+        'runs': int(np.count_nonzero(high[1:] != high[:-1])) + 1,
+        'sum_x': float(floats.sum()),
+        'sum_x2': float((floats * floats).sum()),
+        'sum_xy': float((floats[1:] * floats[:-1]).sum()),
+        'gaps': gaps,
+        'leading_gap': int(positions[0]) if len(positions) else n,
+        'trailing_gap': int(n - 1 - positions[-1]) if len(positions) else n,
+        'has_gap_face': bool(len(positions))
+    }
+
+
+def _summarize_python(values, fete, gap_face):
+    n = len(values)
+    counts = [0] * fete
+    gaps = [0] * (GAP_LIMIT + 1)
+    n_high = 0
+    runs = 1
+    sum_x = sum_x2 = sum_xy = 0
+    previous = None
+    previous_high = None
+    first_position = last_position = None
+
+    for index, value in enumerate(values):
+        counts[value - 1] += 1
+        is_high = 2 * value > fete
+        n_high += is_high
+        sum_x += value
+        sum_x2 += value * value
+        if previous is not None:
+            sum_xy += previous * value
+            if is_high != previous_high:
+                runs += 1
+        if value == gap_face:
+            if last_position is None:
+                first_position = index
+            else:
+                gaps[min(index - last_position - 1, GAP_LIMIT)] += 1
+            last_position = index
+        previous = value
+        previous_high = is_high
+
+    return {
+        'n': n,
+        'counts': counts,
+        'first': values[0],
+        'last': values[-1],
+        'n_high': n_high,
+        'runs': runs,
+        'sum_x': float(sum_x),
+        'sum_x2': float(sum_x2),
+        'sum_xy': float(sum_xy),
+        'gaps': gaps,
+        'leading_gap': first_position if first_position is not None else n,
+        'trailing_gap': n - 1 - last_position if last_position is not None else n,
+        'has_gap_face': last_position is not None
+    }
+
+
+def _audit_chunk(args):
+    backend, fete, size, seed, index, gap_face = args
+    values = draw_chunk(backend, fete, size, seed, index)
+    return summarize_chunk(values, fete, gap_face)
+
+
+class AuditState:
+    def __init__(self, fete, gap_face=1):
+        self.fete = fete
+        self.gap_face = gap_face
+        self.n = 0
+        self.counts = [0] * fete
+        self.n_high = 0
+        self.runs = 0
+        self.sum_x = 0.0
+        self.sum_x2 = 0.0
+        self.sum_xy = 0.0
+        self.gaps = [0] * (GAP_LIMIT + 1)
+        self.last = None
+        self.open_gap = None
+
+    def merge(self, chunk):
+        if self.last is None:
+            self.runs = chunk['runs']
+        else:
+            joined = (2 * self.last > self.fete) == (2 * chunk['first'] > self.fete)
+            self.runs += chunk['runs'] - (1 if joined else 0)
+            self.sum_xy += self.last * chunk['first']
+
+        self.n += chunk['n']
+        self.counts = [a + b for a, b in zip(self.counts, chunk['counts'])]
+        self.n_high += chunk['n_high']
+        self.sum_x += chunk['sum_x']
+        self.sum_x2 += chunk['sum_x2']
+        self.sum_xy += chunk['sum_xy']
+        self.last = chunk['last']
+
+        if chunk['has_gap_face']:
+            if self.open_gap is not None:
+                self.gaps[min(self.open_gap + chunk['leading_gap'], GAP_LIMIT)] += 1
+            self.gaps = [a + b for a, b in zip(self.gaps, chunk['gaps'])]
+            self.open_gap = chunk['trailing_gap']
+        elif self.open_gap is not None:
+            self.open_gap += chunk['n']
+
+    def results(self):
+        return {
+            'samples': self.n,
+            'chi_square': self.chi_square_test(),
+            'runs': self.runs_test(),
+            'serial_correlation': self.serial_correlation_test(),
+            'gap': self.gap_test()
+        }
+
+    def chi_square_test(self):
+        expected = [self.n / self.fete] * self.fete
+        statistic, df, p_value = chi_square(self.counts, expected)
+        return {'statistic': statistic, 'df': df, 'p_value': p_value, 'counts': list(self.counts)}
+
+    def runs_test(self):
+        n1 = self.n_high
+        n2 = self.n - n1
+        if n1 == 0 or n2 == 0 or self.n < 3:
+            return {'runs': self.runs, 'z': 0.0, 'p_value': 1.0}
+        mean = 2 * n1 * n2 / self.n + 1
+        variance = (mean - 1) * (mean - 2) / (self.n - 1)
+        z = (self.runs - mean) / math.sqrt(variance)
+        return {'runs': self.runs, 'expected': mean, 'z': z, 'p_value': normal_p_value(z)}
+
+    def serial_correlation_test(self):
+        if self.n < 3:
+            return {'r': 0.0, 'z': 0.0, 'p_value': 1.0}
+        mean = self.sum_x / self.n
+        variance = self.sum_x2 / self.n - mean * mean
+        if variance <= 0:
+            return {'r': 1.0, 'z': float('inf'), 'p_value': 0.0}
+        r = (self.sum_xy / (self.n - 1) - mean * mean) / variance
+        z = (r + 1 / self.n) * math.sqrt(self.n)
+        return {'r': r, 'z': z, 'p_value': normal_p_value(z)}
+
+    def gap_test(self):
+        total = sum(self.gaps)
+        p = 1 / self.fete
+        expected = [total * p * (1 - p) ** k for k in range(GAP_LIMIT)]
+        expected.append(total * (1 - p) ** GAP_LIMIT)
+        statistic, df, p_value = chi_square(self.gaps, expected)
+        return {'face': self.gap_face, 'gaps': total, 'statistic': statistic, 'df': df, 'p_value': p_value}
+
+
+def audit_rng(samples, backend='numpy', fete=6, workers=None, chunk_size=DEFAULT_CHUNK_SIZE,
+              seed=None, gap_face=1, report_every=10):
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend necunoscut: {backend}")
+    if seed is None:
+        seed = int.from_bytes(os.urandom(4), 'little')
+
+    chunk_count = max(1, math.ceil(samples / chunk_size))
+    tasks = (
+        (backend, fete, min(chunk_size, samples - index * chunk_size), seed, index, gap_face)
+        for index in range(chunk_count)
+    )
+
+    state = AuditState(fete, gap_face)
+    started = time.perf_counter()
+
+    with Pool(processes=workers) as pool:
+        # imap keeps chunk order, which the runs/serial/gap merge relies on
+        for done, chunk in enumerate(pool.imap(_audit_chunk, tasks), start=1):
+            state.merge(chunk)
+            if done % report_every == 0 or done == chunk_count:
+                report = state.results()
+                report['type'] = 'final' if done == chunk_count else 'progress'
+                report['backend'] = backend
+                report['seed'] = seed
+                report['elapsed'] = time.perf_counter() - started
+                yield report
+
+
+def audit_recorded_rolls(db_paths, period='day', fete=6):
+    if period not in PERIOD_FORMATS:
+        raise ValueError(f"Perioada necunoscuta: {period}")
+
+    single_die_modes = [name for name, variant in RULE_VARIANTS.items() if variant.dice_count == 1]
+    placeholders = ', '.join('?' for _ in single_die_modes)
+
+    for db_path in db_paths:
+        kiosk = os.path.splitext(os.path.basename(db_path))[0]
+        conn = sqlite3.connect(db_path)
+        cursor = conn.cursor()
+
+        # only rolls of the audited die; games saved before dice_faces was recorded are left out
+        columns = {row[1] for row in cursor.execute('PRAGMA table_info(game_history)')}
+        die_filter = 'g.dice_faces = ?' if 'dice_faces' in columns else '0'
+        cursor.execute(f'''
+            SELECT strftime(?, m.timestamp) AS bucket, m.dice_result, COUNT(*)
+            FROM player_moves m
+            JOIN game_history g ON g.id = m.game_id
+            WHERE m.action = 'roll' AND g.game_mode IN ({placeholders}) AND {die_filter}
+            GROUP BY bucket, m.dice_result
+            ORDER BY bucket
+        ''', [PERIOD_FORMATS[period]] + single_die_modes + ([fete] if 'dice_faces' in columns else []))
+
+        bucket = None
+        counts = None
+        out_of_range = 0
+        for row_bucket, dice_result, count in cursor:
+            if row_bucket != bucket:
+                if bucket is not None:
+                    yield _recorded_report(kiosk, period, bucket, counts, out_of_range)
+                bucket = row_bucket
+                counts = [0] * fete
+                out_of_range = 0
+            if isinstance(dice_result, int) and 1 <= dice_result <= fete:
+                counts[dice_result - 1] += count
+            else:
+                out_of_range += count
+        if bucket is not None:
+            yield _recorded_report(kiosk, period, bucket, counts, out_of_range)
+
+        conn.close()
+
+
+def _recorded_report(kiosk, period, bucket, counts, out_of_range):
+    n = sum(counts)
+    statistic, df, p_value = chi_square(counts, [n / len(counts)] * len(counts)) if n else (0.0, 0, 1.0)
+    return {
+        'type': 'recorded',
+        'kiosk': kiosk,
+        'period': period,
+        'bucket': bucket,
+        'samples': n,
+        'counts': counts,
+        'out_of_range': out_of_range,
+        'chi_square': {'statistic': statistic, 'df': df, 'p_value': p_value}
+    }
+
+
+def verdict(p_value):
+    return "OK" if p_value >= SIGNIFICANCE else "SUSPECT"
+
+
+def format_report(report):
+    if report['type'] == 'recorded':
+        chi = report['chi_square']
+        line = (f"[{report['kiosk']} {report['bucket']}] n={report['samples']} "
+                f"chi2={chi['statistic']:.2f} (df={chi['df']}) p={chi['p_value']:.4f} {verdict(chi['p_value'])}")
+        if report['out_of_range']:
+            line += f" valori invalide={report['out_of_range']}"
+        return line
+
+    lines = [f"[{report['type']}] {report['backend']} n={report['samples']:,} "
+             f"({report['samples'] / max(report['elapsed'], 1e-9):,.0f}/s)"]
+    chi = report['chi_square']
+    lines.append(f"  chi-patrat: {chi['statistic']:.2f} (df={chi['df']}) p={chi['p_value']:.4f} {verdict(chi['p_value'])}")
+    runs = report['runs']
+    lines.append(f"  runs: {runs['runs']} z={runs['z']:.3f} p={runs['p_value']:.4f} {verdict(runs['p_value'])}")
+    serial = report['serial_correlation']
+    lines.append(f"  corelatie seriala: r={serial['r']:.6f} p={serial['p_value']:.4f} {verdict(serial['p_value'])}")
+    gap = report['gap']
+    lines.append(f"  gap (fata {gap['face']}): chi2={gap['statistic']:.2f} (df={gap['df']}) "
+                 f"p={gap['p_value']:.4f} {verdict(gap['p_value'])}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Audit de corectitudine pentru zaruri")
+    parser.add_argument('--samples', type=int, default=10 ** 8)
+    parser.add_argument('--backend', choices=BACKENDS, default='numpy' if np is not None else 'random')
+    parser.add_argument('--fete', type=int, default=6)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--report-every', type=int, default=10)
+    parser.add_argument('--db', action='append', default=[],
+                        help="baza de date a unui chiosc (se poate repeta)")
+    parser.add_argument('--period', choices=PERIOD_FORMATS, default='day')
+    args = parser.parse_args(argv)
+
+    if args.db:
+        for report in audit_recorded_rolls(args.db, period=args.period, fete=args.fete):
+            print(format_report(report), flush=True)
+        return 0
+
+    failed = False
+    for report in audit_rng(args.samples, backend=args.backend, fete=args.fete, workers=args.workers,
+                            chunk_size=args.chunk_size, seed=args.seed, report_every=args.report_every):
+        print(format_report(report), flush=True)
+        if report['type'] == 'final':
+            failed = any(report[test]['p_value'] < SIGNIFICANCE
+                         for test in ('chi_square', 'runs', 'serial_correlation', 'gap'))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
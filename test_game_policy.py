@@ -0,0 +1,25 @@
+from game_analysis import analyze_game
+from joc_zaruri import GamePolicy, compile_rules
+
+
+def test_never_rolling_opponent_loses_to_computer():
+    distribution = analyze_game('standard', 6, 21, ('threshold', 0), ('computer', 'greu'))
+    assert distribution['unfinished'] < 1e-6
+    assert distribution['winners'][2] > 0.75
+    assert distribution['winners'][1] < distribution['winners'][2]
+
+
+def test_computer_does_not_roll_into_a_lost_position():
+    policy = GamePolicy.for_rules(compile_rules('standard', 6, 21))
+    # at 20 only a 1 point roll is safe, and a 1 loses
+    assert not policy.should_roll(20, 0)
+    assert not policy.should_roll(20, 0, opponent_passed=True)
+
+
+def test_fara_pasare_games_finish():
+    policy = GamePolicy.for_rules(compile_rules('fara_pasare', 6, 21))
+    # passing back after a pass would never end the game
+    assert all(policy.should_roll(score, opponent, opponent_passed=True)
+               for score in range(21) for opponent in range(21))
+    distribution = analyze_game('fara_pasare', 6, 21, 'optimal', 'optimal')
+    assert distribution['unfinished'] < 1e-6